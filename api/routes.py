@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 import asyncio
+from contextlib import asynccontextmanager
 from services.agents.rag_agent import RAGAgent
 from services.agents.portfolio_agent import PortfolioAgent
 from services.agents.stock_agent import StockAgent
@@ -203,6 +204,17 @@ async def clear_cache():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@asynccontextmanager
+async def lifespan(app):
+    """
+    App lifespan: close every pooled Groq HTTP session on shutdown.
+    """
+    yield
+    await mcp.llm.aclose()
+    await groq_llm.aclose()
+    await language_service.aclose()
+
+
 @router.get("/health")
 async def health_check():
     """
@@ -1,6 +1,6 @@
 # backend/main.py
 from fastapi import FastAPI
-from api.routes import router
+from api.routes import lifespan, router
 from fastapi.middleware.cors import CORSMiddleware
 
 origins = ["http://localhost:3000"]
@@ -10,6 +10,7 @@ app = FastAPI(
     title="Finance Assistant",
     description="Multi-agent financial assistant with RAG, portfolio, stock, and email tools",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -19,7 +19,7 @@ class StockAgent:
         price_match = re.match(r"(price of|current price of)\s+([A-Za-z]+)", query)
         if price_match:
             ticker = price_match.group(2).upper()
-            price = self.tool.get_price(ticker)
+            price = self.tool.get_price_fast(ticker)
             return {"ticker": ticker, "current_price": round(price, 2)}
 
         # Moving average query
@@ -46,41 +46,28 @@ def snapshot_html_template(snapshot: dict, user_name="Semer") -> str:
     )
     value_arrow = "▲" if value_change and value_change >= 0 else "▼"
 
-    # Biggest mover
-    biggest_mover = max(
-        pl_details.items(),
-        key=lambda x: (
-            abs(x[1]["profit_loss"] / x[1]["cost_basis"] * 100)
-            if x[1].get("cost_basis")
-            else 0
-        ),
-        default=(None, None),
-    )
-    ticker = biggest_mover[0]
-    biggest_change = (
-        round(biggest_mover[1]["profit_loss"] / biggest_mover[1]["cost_basis"] * 100, 2)
-        if biggest_mover[1] and biggest_mover[1].get("cost_basis")
-        else 0
-    )
+    # Biggest mover + P/L % of valid tickers, gathered in a single pass
+    ticker = next(iter(pl_details), None)
+    biggest_change = 0
+    pl_percentages = []
+    for t, info in pl_details.items():
+        if not info.get("cost_basis") or info.get("current_price") is None:
+            continue
+        pct = info["profit_loss"] / info["cost_basis"] * 100
+        pl_percentages.append(pct)
+        if abs(pct) > abs(biggest_change):
+            ticker, biggest_change = t, pct
+    biggest_change = round(biggest_change, 2)
     mover_arrow = "▲" if biggest_change >= 0 else "▼"
 
-    # Volatility / risk: only valid tickers
-    pl_percentages = [
-        (info["profit_loss"] / info["cost_basis"] * 100)
-        for info in pl_details.values()
-        if info.get("cost_basis") and info.get("current_price") is not None
-    ]
-    volatility = (
-        math.sqrt(
-            sum(
-                (x - sum(pl_percentages) / len(pl_percentages)) ** 2
-                for x in pl_percentages
-            )
-            / len(pl_percentages)
+    # Volatility / risk: only valid tickers (mean hoisted out of the sum)
+    if pl_percentages:
+        mean_pct = sum(pl_percentages) / len(pl_percentages)
+        volatility = math.sqrt(
+            sum((x - mean_pct) ** 2 for x in pl_percentages) / len(pl_percentages)
         )
-        if pl_percentages
-        else 0
-    )
+    else:
+        volatility = 0
 
     # Warnings for failed tickers
     warnings = latest.get("warnings", {})
@@ -91,6 +91,9 @@ class GroqLanguageDetector:
 
         self.llm = GroqLLM()
 
+    async def aclose(self):
+        await self.llm.aclose()
+
     async def detect(self, text: str) -> LanguageDetectionResult:
         prompt = (
             "Detect the language and dialect of the following text. "
@@ -172,6 +175,15 @@ class LanguageDetectionService:
         local_result.detected_by = "local"
         return local_result
 
+    async def aclose(self):
+        """
+        Close the pooled Groq sessions of the lazily created LLM clients.
+        """
+        if self.groq_detector is not None:
+            await self.groq_detector.aclose()
+        if self._llm is not None:
+            await self._llm.aclose()
+
     def get_response_language(self, result: LanguageDetectionResult) -> str:
         return result.language
 
@@ -385,3 +385,17 @@ class MCPAgent:
         self.cache_manager.set_cached("final_response", query, final_result)
 
         return final_result, selected_names, False
+
+    async def run_many(
+        self,
+        queries: List[str],
+        language: str = "English",
+        style: str = "professional",
+    ) -> List[Tuple[Dict, List[str], bool]]:
+        """
+        Run several queries concurrently. Agent calls stay bounded by the shared
+        semaphore, and every LLM call reuses this agent's pooled aiohttp session.
+        """
+        return await asyncio.gather(
+            *(self.run(q, language=language, style=style) for q in queries)
+        )
@@ -6,7 +6,8 @@ Since all content is now normalized to str, simplified to text chunking.
 """
 
 import json
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import Iterable, Iterator, List, Dict, Any
 def chunk_text(text: str, chunk_size: int = 500, overlap: int = 100) -> List[str]:
     """
     Split text into chunks of approximately `chunk_size` characters with overlap.
@@ -48,4 +49,69 @@ def chunk_content(content: str, chunk_size: int = 500, overlap: int = 100) -> Li
     Returns:
         List[str]: List of chunks.
     """
-    return chunk_text(content, chunk_size, overlap)
\ No newline at end of file
+    return chunk_text(content, chunk_size, overlap)
+
+
+def stream_chunks(
+    pieces: Iterable[str], chunk_size: int = 500, overlap: int = 100
+) -> Iterator[str]:
+    """
+    Lazily chunk a stream of text pieces (e.g. PDF pages), producing the same
+    chunks as `chunk_text` on their concatenation while only buffering about
+    one chunk at a time.
+
+    Args:
+        pieces (Iterable[str]): Text fragments, in document order.
+        chunk_size (int): Target size of each chunk (default: 500).
+        overlap (int): Overlap between consecutive chunks (default: 100).
+
+    Yields:
+        str: Text chunks.
+    """
+    step = chunk_size - overlap
+    buf, start = "", 0
+    for piece in pieces:
+        # drop consumed text once per piece, not once per chunk (keeps this linear)
+        buf = buf[start:] + piece
+        start = 0
+        while len(buf) - start >= chunk_size:
+            yield buf[start : start + chunk_size]
+            start += step
+    # drain the tail exactly as chunk_text's loop would
+    while start < len(buf):
+        yield buf[start : start + chunk_size]
+        start += step
+
+
+def write_chunks(chunks: Iterable[str], file_path: Path) -> int:
+    """
+    Save all chunks of a document to a single JSONL file (one {"id", "text"} per line).
+
+    Args:
+        chunks (Iterable[str]): Chunks of one document, in order (may be a generator).
+        file_path (Path): Destination .jsonl file.
+
+    Returns:
+        int: Number of chunks written.
+    """
+    count = 0
+    with Path(file_path).open("w", encoding="utf-8") as fh:
+        for count, chunk in enumerate(chunks, 1):
+            fh.write(json.dumps({"id": count - 1, "text": chunk}) + "\n")
+    return count
+
+
+def iter_chunks(file_path: Path) -> Iterator[str]:
+    """
+    Lazily read back chunks saved by `write_chunks`.
+
+    Args:
+        file_path (Path): Path to a chunks .jsonl file.
+
+    Yields:
+        str: Chunk text, in saved order.
+    """
+    with Path(file_path).open("r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)["text"]
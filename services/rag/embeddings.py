@@ -1,8 +1,10 @@
 # backend/services/rag/embeddings.py
 from pathlib import Path
 from typing import List, Dict, Optional
-import numpy as np
 import faiss
+import pyarrow as pa
+import pyarrow.compute as pc
+import torch
 from sentence_transformers import SentenceTransformer
 import os
 import pickle
@@ -11,40 +13,142 @@ from dotenv import load_dotenv
 # Load .env once
 load_dotenv()
 
+# Schema metadata key recording whether the index was embedded by a quantized model
+PRECISION_KEY = "embedding_precision"
+
+# Chunk metadata is stored column-wise; rows are materialized only for search hits
+META_SCHEMA = pa.schema(
+    [
+        ("doc_id", pa.string()),
+        ("chunk_id", pa.int32()),
+        ("source", pa.string()),
+        ("content", pa.string()),
+    ]
+)
+
 
 class FaissIndex:
-    def __init__(self, model_name: Optional[str] = None, dim: Optional[int] = None):
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        dim: Optional[int] = None,
+        quantize: Optional[bool] = None,
+    ):
         # Use constructor arg > .env > hardcoded default
         model_name = (
             model_name
             or os.getenv("EMBEDDING_MODEL")
             or "sentence-transformers/all-MiniLM-L6-v2"
         )
+        if quantize is None:
+            # off by default: a quantized model's vectors drift slightly from an
+            # FP32 index, so opt in explicitly (the precision is saved with it)
+            quantize = os.getenv("EMBEDDING_QUANTIZE", "0").lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        self.quantized = quantize
         self.model = SentenceTransformer(model_name)
+        if quantize:
+            self._reduce_precision()
         self.dim = dim or self.model.get_sentence_embedding_dimension()
         self.index = faiss.IndexFlatIP(self.dim)
-        self.metadatas = []
+        self.meta_table = META_SCHEMA.empty_table()
+        self._doc_ids = None
+
+    def _reduce_precision(self):
+        """FP16 on CUDA, dynamic INT8 Linear layers on CPU (inference only)."""
+        if self.model.device.type == "cuda":
+            self.model.half()
+        else:
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
 
     def _encode(self, texts: List[str]):
-        embs = self.model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
-        norms = np.linalg.norm(embs, axis=1, keepdims=True) + 1e-9
-        embs = embs / norms
-        return embs.astype("float32")
+        # Unit-length vectors make IndexFlatIP a cosine search with no extra pass
+        embs = self.model.encode(
+            texts,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return embs.astype("float32", copy=False)
 
     def add(self, texts: List[str], metadatas: List[Dict]):
         embs = self._encode(texts)
         self.index.add(embs)
-        self.metadatas.extend(metadatas)
+        self._append_metadata(metadatas)
+
+    def _append_metadata(self, metadatas: List[Dict]):
+        batch = pa.Table.from_pydict(
+            {
+                "doc_id": [md.get("doc_id") for md in metadatas],
+                "chunk_id": [md.get("chunk_id") for md in metadatas],
+                "source": [
+                    md.get("meta", {}).get("source", md.get("source"))
+                    for md in metadatas
+                ],
+                "content": [md.get("content") for md in metadatas],
+            },
+            schema=META_SCHEMA,
+        )
+        self.meta_table = pa.concat_tables([self.meta_table, batch])
+        self._doc_ids = None
+
+    @property
+    def _precision(self) -> str:
+        return "quantized" if self.quantized else "fp32"
+
+    def __len__(self) -> int:
+        return self.index.ntotal
+
+    def truncate(self, n: int):
+        """Drop every vector and metadata row from position `n` on."""
+        if self.index.ntotal > n:
+            self.index.remove_ids(faiss.IDSelectorRange(n, self.index.ntotal))
+        self.meta_table = self.meta_table.slice(0, n)
+        self._doc_ids = None
+
+    @staticmethod
+    def _as_metadata(row: Dict) -> Dict:
+        """Rebuild the metadata dict shape callers expect from a table row."""
+        return {
+            "doc_id": row["doc_id"],
+            "chunk_id": row["chunk_id"],
+            "meta": {"source": row["source"]} if row["source"] is not None else {},
+            "content": row["content"],
+        }
+
+    @property
+    def doc_ids(self) -> set:
+        """Distinct doc ids in the index (cached until the next add)."""
+        if self._doc_ids is None:
+            self._doc_ids = set(pc.unique(self.meta_table["doc_id"]).to_pylist())
+        return self._doc_ids
+
+    @property
+    def metadatas(self) -> List[Dict]:
+        """All metadata as dicts (materializes every row; avoid in hot paths)."""
+        return [self._as_metadata(row) for row in self.meta_table.to_pylist()]
 
     def search(self, query: str, k: int = 5):
         q_emb = self._encode([query])
         D, I = self.index.search(q_emb, k)
-        results = []
-        for score, idx in zip(D[0], I[0]):
-            if idx < 0 or idx >= len(self.metadatas):
-                continue
-            results.append({"score": float(score), "metadata": self.metadatas[idx]})
-        return results
+        n_rows = self.meta_table.num_rows
+        hits = [
+            (float(score), int(idx))
+            for score, idx in zip(D[0], I[0])
+            if 0 <= idx < n_rows
+        ]
+        if not hits:
+            return []
+        rows = self.meta_table.take([idx for _, idx in hits]).to_pylist()
+        return [
+            {"score": score, "metadata": self._as_metadata(row)}
+            for (score, _), row in zip(hits, rows)
+        ]
 
     # ------------------------------
     # Save and Load methods
@@ -53,8 +157,12 @@ class FaissIndex:
         p = Path(path)
         p.mkdir(parents=True, exist_ok=True)
         faiss.write_index(self.index, str(p / "index.faiss"))
-        with open(p / "metadatas.pkl", "wb") as fh:
-            pickle.dump(self.metadatas, fh)
+        table = self.meta_table.combine_chunks().replace_schema_metadata(
+            {PRECISION_KEY: self._precision}
+        )
+        with pa.OSFile(str(p / "metadatas.arrow"), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
 
     @classmethod
     def load(cls, path: str, model_name: Optional[str] = None):
@@ -67,6 +175,18 @@ class FaissIndex:
         )
         inst = cls(model_name=model_name)
         inst.index = faiss.read_index(str(p / "index.faiss"))
-        with open(p / "metadatas.pkl", "rb") as fh:
-            inst.metadatas = pickle.load(fh)
+        if (p / "metadatas.arrow").exists():
+            with pa.OSFile(str(p / "metadatas.arrow"), "rb") as source:
+                table = pa.ipc.open_file(source).read_all()
+            saved = (table.schema.metadata or {}).get(PRECISION_KEY.encode())
+            if saved is not None and saved.decode() != inst._precision:
+                print(
+                    f"⚠️ Index at {p} was embedded in {saved.decode()} but queries "
+                    f"use {inst._precision}; match EMBEDDING_QUANTIZE or re-ingest."
+                )
+            inst.meta_table = table.replace_schema_metadata(None)
+        else:
+            # indexes saved before the Arrow switch
+            with open(p / "metadatas.pkl", "rb") as fh:
+                inst._append_metadata(pickle.load(fh))
         return inst
@@ -2,7 +2,7 @@
 import os
 from typing import Dict
 from services.rag.parser import parse_file
-from services.rag.chunking import chunk_content
+from services.rag.chunking import chunk_content, write_chunks
 from services.rag.embeddings import FaissIndex as EmbeddingsManager
 
 CHUNK_SAVE_DIR = "data/chunks"  # folder to save chunks
@@ -20,8 +20,7 @@ def ingest_file(file_path: str, em: EmbeddingsManager):
         return
 
     # Skip if already ingested
-    ingested_files = {meta["file"] for meta in em.metadatas}
-    if file_name in ingested_files:
+    if file_name in em.doc_ids:
         print(f"✅⏭️ {file_name} already ingested, skipping...")
         return
 
@@ -44,14 +43,11 @@ def ingest_file(file_path: str, em: EmbeddingsManager):
         save_path = os.path.join(os.getcwd(), CHUNK_SAVE_DIR, file_name)  # full path
         os.makedirs(save_path, exist_ok=True)
 
-        for i, chunk in enumerate(chunks):
-            # replace invalid filename chars if any
-            safe_file_name = "".join(
-                c if c.isalnum() or c in "-_." else "_" for c in file_name
-            )
-            chunk_file = os.path.join(save_path, f"{safe_file_name}_chunk{i+1}.txt")
-            with open(chunk_file, "w", encoding="utf-8") as f:
-                f.write(chunk)
+        # replace invalid filename chars if any
+        safe_file_name = "".join(
+            c if c.isalnum() or c in "-_." else "_" for c in file_name
+        )
+        write_chunks(chunks, os.path.join(save_path, f"{safe_file_name}_chunks.jsonl"))
 
         print(f"💾 [CHUNKS] {len(chunks)} chunks saved to {save_path}")
 
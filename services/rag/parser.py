@@ -7,9 +7,11 @@ Extracts text content from files as strings for further processing in RAG.
 import os
 import csv
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List
 from PyPDF2 import PdfReader  # Requires: pip install PyPDF2
 
+from services.rag.chunking import stream_chunks
+
 
 def parse_pdf(file_path: str) -> str:
     """
@@ -21,15 +23,26 @@ def parse_pdf(file_path: str) -> str:
     Returns:
         str: Concatenated text from all pages.
     """
+    return "".join(iter_pdf_pages(file_path)).strip()
+
+
+def iter_pdf_pages(file_path: str) -> Iterator[str]:
+    """
+    Lazily extract text from a PDF, one page at a time.
+
+    Args:
+        file_path (str): Path to the PDF file.
+
+    Yields:
+        str: Text of each page (empty string for pages without text).
+    """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"PDF file not found: {file_path}")
 
-    text = ""
     with open(file_path, "rb") as file:
         reader = PdfReader(file)
         for page in reader.pages:
-            text += page.extract_text() or ""
-    return text.strip()
+            yield page.extract_text() or ""
 
 
 def parse_csv(file_path: str) -> str:
@@ -102,8 +115,55 @@ def parse_file(file_path: str) -> str:
         raise ValueError(f"Unsupported file type: {ext}")
 
 
+def iter_file_text(file_path: str) -> Iterator[str]:
+    """
+    Streaming counterpart of `parse_file`: PDFs are yielded page by page,
+    other supported types as a single string.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Yields:
+        str: Consecutive pieces of the document text.
+
+    Raises:
+        ValueError: If unsupported file type.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".pdf":
+        yield from iter_pdf_pages(file_path)
+    else:
+        yield parse_file(file_path)
+
+
+def iter_file_chunks(
+    file_path: str, chunk_size: int = 500, overlap: int = 100
+) -> Iterator[str]:
+    """
+    Lazily parse and chunk one file (blank pages skipped), never holding the
+    whole document text.
+
+    Args:
+        file_path (str): Path to the file.
+        chunk_size (int): Target size of each chunk (default: 500).
+        overlap (int): Overlap between consecutive chunks (default: 100).
+
+    Yields:
+        str: Text chunks, in document order.
+    """
+    pages = (page for page in iter_file_text(file_path) if page.strip())
+    yield from stream_chunks(pages, chunk_size, overlap)
+
+
+def chunk_file(file_path: str, chunk_size: int = 500, overlap: int = 100) -> List[str]:
+    """
+    Process-pool worker: all chunks of one file as a list. Lives here rather
+    than in rag_tool so spawned workers only import the parsing stack.
+    """
+    return list(iter_file_chunks(file_path, chunk_size, overlap))
+
+
 from pathlib import Path
-from typing import List
 
 
 def list_files(directory: str, exts: List[str] = None) -> List[Path]:
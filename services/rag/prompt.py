@@ -0,0 +1,48 @@
+# services/rag/prompt.py
+"""
+Prompt assembly for RAG answers. Kept free of model/index imports so it can be
+used (and tested) without faiss, torch or the Groq client.
+"""
+
+from typing import List, Dict
+
+SNIPPET_CHARS = 1200  # max chars of a single chunk quoted in the prompt
+PROMPT_CHAR_BUDGET = 8000  # ~2000 tokens for the whole prompt
+DEFAULT_SYSTEM = (
+    "You are a helpful financial assistant. Use the sources to answer concisely."
+)
+
+
+def build_prompt(
+    query: str,
+    retrieved: List[Dict],
+    system_instructions: str = None,
+    max_chars: int = PROMPT_CHAR_BUDGET,
+) -> str:
+    """
+    Build the RAG prompt, adding sources best-score first until `max_chars` is used up.
+    The last source that fits is trimmed; lower-scoring ones are dropped.
+    """
+    head = f"{system_instructions or DEFAULT_SYSTEM}\n\n---\nSources:\n"
+    tail = f"\nQuestion:\n{query}\n\nAnswer:"
+    budget = max_chars - len(head) - len(tail)
+
+    parts = [head]
+    ranked = sorted(retrieved, key=lambda hit: hit["score"], reverse=True)
+    for i, hit in enumerate(ranked):
+        md = hit["metadata"]
+        src = md.get("meta", {}).get("source", md.get("doc_id", "unknown"))
+        header = (
+            f"[{i}] Source: {src}  (score: {hit['score']:.3f})\n"
+            f"Chunk ID: {md.get('chunk_id')}\n"
+            f"Content: "
+        )
+        room = budget - len(header) - 2
+        if room <= 0:
+            break
+        snippet = md.get("content", "")[: min(SNIPPET_CHARS, room)]
+        parts.append(f"{header}{snippet}\n\n")
+        budget -= len(header) + len(snippet) + 2
+
+    parts.append(tail)
+    return "".join(parts)
@@ -1,12 +1,15 @@
 # services/rag/rag_tool.py
 from pathlib import Path
 from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import hashlib
+import multiprocessing
 
 from dotenv import load_dotenv
-from services.rag.parser import parse_file, list_files
-from services.rag.chunking import chunk_content
+from services.rag.parser import chunk_file, iter_file_chunks, list_files
+from services.rag.chunking import write_chunks
 from services.rag.embeddings import FaissIndex
+from services.rag.prompt import build_prompt
 from groq import Groq
 import os
 load_dotenv()
@@ -14,6 +17,10 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 DEFAULT_MODEL = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
 CHUNK_SIZE = 1200
 CHUNK_OVERLAP = 200
+SAVE_EVERY = 50  # checkpoint the index every N files during directory ingest
+POOL_MIN_FILES = 8  # below this, process start-up costs more than it saves
+EMBED_BATCH = 128  # chunks embedded per index.add while streaming a file
+
 
 class RAGTool:
     def __init__(
@@ -37,54 +44,133 @@ class RAGTool:
             self.index = FaissIndex.load(self.index_dir, model_name=self.model)
         else:
             self.index = FaissIndex(model_name=self.model)
+        self._ingested_ids = set(self.index.doc_ids)
 
     def _safe_chunk_folder(self, file_name: str) -> Path:
         short_name = file_name[:20].replace(" ", "_")
-        folder_hash = hashlib.md5(file_name.encode("utf-8")).hexdigest()
+        folder_hash = hashlib.blake2b(
+            file_name.encode("utf-8"), digest_size=8
+        ).hexdigest()
         return self.data_dir / "chunks" / f"{short_name}_{folder_hash}"
 
-    def add_file(self, file_path: str):
-        """Parse, chunk, and embed a single file."""
-        f = Path(file_path)
+    def _embed_in_batches(self, chunks, doc_id: str, source: str):
+        """Pass chunks through while adding them to the index EMBED_BATCH at a time."""
+        texts, metadatas = [], []
+        for i, chunk in enumerate(chunks):
+            texts.append(chunk)
+            metadatas.append(
+                {
+                    "doc_id": doc_id,
+                    "chunk_id": i,
+                    "meta": {"source": source},
+                    "content": chunk,
+                }
+            )
+            if len(texts) == EMBED_BATCH:
+                self.index.add(texts, metadatas)
+                texts, metadatas = [], []
+            yield chunk
+
+        if texts:
+            self.index.add(texts, metadatas)
+
+    def _should_ingest(self, f: Path) -> bool:
         if not f.exists() or f.suffix.lower() not in [".pdf", ".csv", ".json"]:
             print(f"⏭️ Skipped {f.name} (unsupported type)")
-            return
-
-        doc_id = f.stem
-        if doc_id in {meta.get("doc_id") for meta in self.index.metadatas}:
+            return False
+        if f.stem in self._ingested_ids:
             print(f"⚠️ Already ingested {f.name}")
-            return
+            return False
+        return True
+
+    def _store_chunks(self, f: Path, chunks) -> int:
+        """Write a document's chunks to its JSONL file and embed them; returns count."""
+        folder = self._safe_chunk_folder(f.name)
+        folder.mkdir(parents=True, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() else "_" for c in f.name)
+        chunk_path = folder / f"{safe_name}_chunks.jsonl"
 
-        text = parse_file(f)
-        if not text:
+        # batches are added to the index while streaming; on a mid-file failure
+        # roll them back so a retry doesn't index the same chunks twice
+        mark = len(self.index)
+        embedded = self._embed_in_batches(chunks, f.stem, f.name)
+        try:
+            n_chunks = write_chunks(embedded, chunk_path)
+        except BaseException:
+            self.index.truncate(mark)
+            chunk_path.unlink(missing_ok=True)
+            raise
+        if not n_chunks:
+            chunk_path.unlink(missing_ok=True)
             print(f"⚠️ Empty file: {f.name}")
+            return 0
+
+        self._ingested_ids.add(f.stem)
+        print(f"✅ Ingested {f.name}: {n_chunks} chunks")
+        return n_chunks
+
+    def add_file(self, file_path: str, save: bool = True):
+        """Parse, chunk, and embed a single file (save=False defers persisting)."""
+        f = Path(file_path)
+        if not self._should_ingest(f):
             return
 
-        chunks = chunk_content(text, self.chunk_size, self.chunk_overlap)
-        folder = self._safe_chunk_folder(f.name)
-        folder.mkdir(parents=True, exist_ok=True)
+        # pages -> chunks -> (JSONL, embeddings) without materializing the document
+        chunks = iter_file_chunks(f, self.chunk_size, self.chunk_overlap)
+        if self._store_chunks(f, chunks) and save:
+            self.index.save(self.index_dir)
 
-        metadatas = []
-        for i, chunk in enumerate(chunks):
-            safe_name = "".join(c if c.isalnum() else "_" for c in f.name)
-            chunk_file = folder / f"{safe_name}_chunk{i+1}.txt"
-            chunk_file.write_text(chunk, encoding="utf-8")
-            metadatas.append({
-                "doc_id": doc_id,
-                "chunk_id": i,
-                "meta": {"source": f.name},
-                "content": chunk
-            })
-
-        self.index.add(chunks, metadatas)
-        self.index.save(self.index_dir)
-        print(f"✅ Ingested {f.name}: {len(chunks)} chunks")
-
-    def add_directory(self, data_dir: str = None):
-        """Ingest all files from a directory."""
+    def add_directory(self, data_dir: str = None, workers: int = None):
+        """
+        Ingest all files from a directory. With at least POOL_MIN_FILES files,
+        parsing/chunking runs in a process pool (`workers`, default: CPU count);
+        embedding stays in this process. A failing file raises, as in add_file,
+        after the files ingested so far are saved.
+        """
         data_dir = Path(data_dir or self.data_dir)
+        ingested_before = len(self._ingested_ids)
+
+        pending, queued_ids = [], set()
         for f in list_files(data_dir, exts=["pdf", "csv", "json"]):
-            self.add_file(f)
+            if f.stem in queued_ids:
+                print(f"⚠️ Already ingested {f.name}")
+            elif self._should_ingest(f):
+                queued_ids.add(f.stem)
+                pending.append(f)
+
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        try:
+            if workers <= 1 or len(pending) < POOL_MIN_FILES:
+                for i, f in enumerate(pending, 1):
+                    self.add_file(f, save=False)
+                    if i % SAVE_EVERY == 0:
+                        self.index.save(self.index_dir)
+            else:
+                self._add_files_pooled(pending, workers)
+        finally:
+            # Persist once at the end instead of rewriting the whole index per file
+            if len(self._ingested_ids) != ingested_before:
+                self.index.save(self.index_dir)
+
+    def _add_files_pooled(self, files: List[Path], workers: int):
+        # spawn, not fork: workers start clean and import only the parsing stack
+        # instead of inheriting this process's model/index state
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+            futures = {
+                ex.submit(chunk_file, str(f), self.chunk_size, self.chunk_overlap): f
+                for f in files
+            }
+            try:
+                for i, fut in enumerate(as_completed(futures), 1):
+                    self._store_chunks(futures[fut], fut.result())
+                    if i % SAVE_EVERY == 0:
+                        self.index.save(self.index_dir)
+            except BaseException:
+                # don't wait for the rest of the directory before raising
+                for fut in futures:
+                    fut.cancel()
+                raise
 
     def query(self, q: str, top_k: int = 5):
         """Retrieve top chunks and query LLM."""
@@ -102,11 +188,4 @@ class RAGTool:
         return response.choices[0].message.content.strip()
 
     def _build_prompt(self, query: str, retrieved: List[Dict]) -> str:
-        parts = ["You are a helpful financial assistant. Use the sources to answer concisely.", "\n\n---\nSources:\n"]
-        for i, hit in enumerate(retrieved):
-            md = hit["metadata"]
-            src = md.get("meta", {}).get("source", md.get("doc_id", "unknown"))
-            snippet = md.get("content", "")[:1200]
-            parts.append(f"[{i}] Source: {src}  (score: {hit['score']:.3f})\nChunk ID: {md.get('chunk_id')}\nContent: {snippet}\n\n")
-        parts.append(f"\nQuestion:\n{query}\n\nAnswer:")
-        return "\n".join(parts)
+        return build_prompt(query, retrieved)
@@ -1,14 +1,17 @@
 # services/rag/rag_tool.py
-from typing import List, Dict
+from typing import List
 from pathlib import Path
+from functools import lru_cache
+import asyncio
 import os
 import hashlib
 
-from groq import Groq
+from groq import AsyncGroq, Groq
 
 from services.rag.parser import parse_file, list_files
-from services.rag.chunking import chunk_content
+from services.rag.chunking import chunk_content, write_chunks
 from services.rag.embeddings import FaissIndex
+from services.rag.prompt import build_prompt
 from dotenv import load_dotenv
 import os
 
@@ -28,7 +31,7 @@ CHUNK_SAVE_DIR.mkdir(parents=True, exist_ok=True)
 def _safe_chunk_folder(file_name: str) -> Path:
     """Generate a safe folder name using hash to avoid Windows path issues."""
     short_name = file_name[:20].replace(" ", "_")
-    folder_hash = hashlib.md5(file_name.encode("utf-8")).hexdigest()
+    folder_hash = hashlib.blake2b(file_name.encode("utf-8"), digest_size=8).hexdigest()
     return CHUNK_SAVE_DIR / f"{short_name}_{folder_hash}"
 
 
@@ -42,7 +45,7 @@ def ingest_new_files(data_dir: Path = DATA_DIR, index_dir: Path = INDEX_DIR):
     # Load existing index or create new
     if index_dir.exists() and any(index_dir.iterdir()):
         index = FaissIndex.load(index_dir, model_name=DEFAULT_MODEL)
-        ingested_ids = {meta.get("doc_id") for meta in index.metadatas}
+        ingested_ids = index.doc_ids
         print(f"📂 Loaded existing FAISS index with {len(ingested_ids)} documents")
     else:
         index = FaissIndex(model_name=DEFAULT_MODEL)
@@ -75,11 +78,8 @@ def ingest_new_files(data_dir: Path = DATA_DIR, index_dir: Path = INDEX_DIR):
             # Save chunks
             folder = _safe_chunk_folder(f.name)
             folder.mkdir(parents=True, exist_ok=True)
-            for i, chunk in enumerate(doc_chunks):
-                safe_name = "".join(c if c.isalnum() else "_" for c in f.name)
-                chunk_file = folder / f"{safe_name}_chunk{i+1}.txt"
-                with open(chunk_file, "w", encoding="utf-8") as cf:
-                    cf.write(chunk)
+            safe_name = "".join(c if c.isalnum() else "_" for c in f.name)
+            write_chunks(doc_chunks, folder / f"{safe_name}_chunks.jsonl")
 
             # Add chunks to index
             metadatas = [
@@ -104,53 +104,35 @@ def ingest_new_files(data_dir: Path = DATA_DIR, index_dir: Path = INDEX_DIR):
     # Save FAISS index after processing new files only
     index_dir.mkdir(parents=True, exist_ok=True)
     index.save(index_dir)
+    # Drop any index loaded before this ingest so retrieval sees the new chunks
+    _load_index_cached.cache_clear()
     print(f"💾 FAISS index updated: {new_docs} new docs, {new_chunks} new chunks")
     return {"new_docs": new_docs, "new_chunks": new_chunks}
 
 
 # ------------------- Retrieval -------------------
-def load_index(index_dir: Path = INDEX_DIR):
-    if index_dir.exists() and any(index_dir.iterdir()):
-        return FaissIndex.load(index_dir, model_name=DEFAULT_MODEL)
+@lru_cache(maxsize=4)
+def _load_index_cached(index_dir: str) -> FaissIndex:
+    """Load the index + embedding model once per directory (keyed by str path)."""
+    p = Path(index_dir)
+    if p.exists() and any(p.iterdir()):
+        return FaissIndex.load(p, model_name=DEFAULT_MODEL)
     else:
         print("⚠️ No FAISS index found. Creating empty index.")
         return FaissIndex(model_name=DEFAULT_MODEL)
 
 
+def load_index(index_dir: Path = INDEX_DIR):
+    return _load_index_cached(str(index_dir))
+
+
 def retrieve(query: str, top_k: int = 5, index_dir: Path = INDEX_DIR):
     index = load_index(index_dir)
     return index.search(query, k=top_k)
 
 
-def build_prompt(
-    query: str, retrieved: List[Dict], system_instructions: str = None
-) -> str:
-    system = (
-        system_instructions
-        or "You are a helpful financial assistant. Use the sources to answer concisely."
-    )
-
-    parts = [system, "\n\n---\nSources:\n"]
-
-    for i, hit in enumerate(retrieved):
-        md = hit["metadata"]
-        src = md.get("meta", {}).get("source", md.get("doc_id", "unknown"))
-        chunk_text = md.get("content", "")
-
-        # Keep chunks reasonable size
-        snippet = chunk_text[:1200]
-
-        parts.append(
-            f"[{i}] Source: {src}  (score: {hit['score']:.3f})\n"
-            f"Chunk ID: {md.get('chunk_id')}\n"
-            f"Content: {snippet}\n\n"
-        )
-
-    parts.append("\nQuestion:\n" + query + "\n\nAnswer:")
-    return "\n".join(parts)
-
-
 client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful financial assistant."}
 
 
 def call_llm(
@@ -158,10 +140,7 @@ def call_llm(
 ) -> str:
     response = client.chat.completions.create(
         model=model,
-        messages=[
-            {"role": "system", "content": "You are a helpful financial assistant."},
-            {"role": "user", "content": prompt},
-        ],
+        messages=[SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
         max_tokens=max_tokens,
         temperature=0.1,
     )
@@ -169,6 +148,19 @@ def call_llm(
     return response.choices[0].message.content.strip()
 
 
+async def _call_llm_async(
+    aclient: AsyncGroq, prompt: str, model: str, max_tokens: int
+) -> str:
+    """Async twin of `call_llm`: same messages and sampling, plain-text answer."""
+    response = await aclient.chat.completions.create(
+        model=model,
+        messages=[SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        temperature=0.1,
+    )
+    return response.choices[0].message.content.strip()
+
+
 def answer_query(
     query: str,
     top_k: int = 5,
@@ -181,6 +173,46 @@ def answer_query(
     return {"query": query, "prompt": prompt, "answer": resp, "retrieved": hits}
 
 
+async def answer_batch(
+    queries: List[str],
+    top_k: int = 5,
+    system_instructions: str = None,
+    index_dir: Path = INDEX_DIR,
+    model: str = "llama-3.3-70b-versatile",
+    max_tokens: int = 512,
+):
+    """
+    Answer several queries concurrently: retrieval runs in worker threads and
+    the LLM calls are issued together, so wall time ~ slowest query, not the sum.
+    A failed query gets an "error" entry instead of failing the whole batch.
+    """
+    # Load once up front so the worker threads don't race on the index cache
+    index = await asyncio.to_thread(load_index, index_dir)
+    hits_list = await asyncio.gather(
+        *[asyncio.to_thread(index.search, q, top_k) for q in queries]
+    )
+    prompts = [
+        build_prompt(q, hits, system_instructions=system_instructions)
+        for q, hits in zip(queries, hits_list)
+    ]
+
+    async with AsyncGroq(api_key=os.getenv("GROQ_API_KEY")) as aclient:
+        answers = await asyncio.gather(
+            *[_call_llm_async(aclient, p, model, max_tokens) for p in prompts],
+            return_exceptions=True,
+        )
+
+    results = []
+    for q, p, a, hits in zip(queries, prompts, answers, hits_list):
+        result = {"query": q, "prompt": p, "retrieved": hits}
+        if isinstance(a, Exception):
+            result["error"] = str(a)
+        else:
+            result["answer"] = a
+        results.append(result)
+    return results
+
+
 # ------------------- CLI -------------------
 if __name__ == "__main__":
     import argparse
@@ -202,7 +234,8 @@ if __name__ == "__main__":
 
     # Interactive multi-query loop
     if args.interactive:
-        index_loaded = False
+        # Warm the index + model once so every query only pays for search
+        load_index()
         print("Entering interactive query mode. Type 'exit' to quit.\n")
         while True:
             query = input("Enter your question: ").strip()
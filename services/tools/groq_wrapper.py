@@ -4,12 +4,15 @@ import os
 import aiohttp
 import asyncio
 import async_timeout
-import json
+import orjson
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Decode model output off the event loop only when it's big enough to matter
+OFFLOAD_PARSE_CHARS = 16_000
+
 
 class GroqLLM:
     """
@@ -18,6 +21,7 @@ class GroqLLM:
     Features:
     - Async and sync calls
     - Retry with delay
+    - Pooled keep-alive HTTP session
     - Timeout handling
     - Robust JSON parsing
     - Configurable endpoint
@@ -30,6 +34,8 @@ class GroqLLM:
                 "Groq API key not provided or missing in env variable 'GROQ_API_KEY'"
             )
         self.endpoint = endpoint or "https://api.groq.com/openai/v1/chat/completions"
+        self._session = None
+        self._session_loop = None
 
     async def call_async(
         self,
@@ -58,34 +64,33 @@ class GroqLLM:
 
         for attempt in range(1, retries + 1):
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with async_timeout.timeout(timeout):
-                        logger.info(
-                            f"[Attempt {attempt}] Sending prompt to Groq (model={model})"
-                        )
-                        async with session.post(
-                            self.endpoint, headers=headers, json=payload
-                        ) as resp:
-                            if resp.status != 200:
-                                text = await resp.text()
-                                raise RuntimeError(
-                                    f"Groq API error {resp.status}: {text}"
-                                )
-                            data = await resp.json()
-
-                            # Extract message content
-                            choices = data.get("choices", [])
-                            if choices and "message" in choices[0]:
-                                text = choices[0]["message"].get("content", "")
-                            else:
-                                text = ""
-
-                            # Parse JSON if possible
-                            try:
-                                parsed = json.loads(text)
-                                return parsed
-                            except json.JSONDecodeError:
-                                return text
+                session = self._get_session()
+                async with async_timeout.timeout(timeout):
+                    logger.info(
+                        f"[Attempt {attempt}] Sending prompt to Groq (model={model})"
+                    )
+                    async with session.post(
+                        self.endpoint, headers=headers, json=payload
+                    ) as resp:
+                        if resp.status != 200:
+                            text = await resp.text()
+                            raise RuntimeError(f"Groq API error {resp.status}: {text}")
+                        data = orjson.loads(await resp.read())
+
+                    # Extract message content
+                    choices = data.get("choices", [])
+                    if choices and "message" in choices[0]:
+                        text = choices[0]["message"].get("content", "")
+                    else:
+                        text = ""
+
+                    # Parse JSON if possible
+                    try:
+                        if len(text) > OFFLOAD_PARSE_CHARS:
+                            return await asyncio.to_thread(orjson.loads, text)
+                        return orjson.loads(text)
+                    except orjson.JSONDecodeError:
+                        return text
             except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 logger.warning(f"Attempt {attempt} failed: {e}")
                 if attempt == retries:
@@ -94,11 +99,65 @@ class GroqLLM:
                     )
                 await asyncio.sleep(1)
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the pooled session, (re)creating it if closed or bound to another loop.
+        Keeping one session alive reuses TCP/TLS connections across calls and retries.
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            self._retire_session()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=32, ttl_dns_cache=300, keepalive_timeout=60
+                )
+            )
+            self._session_loop = loop
+        return self._session
+
+    def _retire_session(self):
+        """
+        Release a still-open session bound to another loop before replacing it:
+        close it on its own loop if that loop is running, else detach it (its
+        connections died with that loop) so it isn't leaked as unclosed.
+        """
+        old, old_loop = self._session, self._session_loop
+        if old is None or old.closed:
+            return
+        if old_loop is not None and old_loop.is_running():
+            asyncio.run_coroutine_threadsafe(old.close(), old_loop)
+        else:
+            old.detach()
+            logger.warning("Detached Groq session left open on a finished event loop")
+
+    async def aclose(self):
+        """
+        Close the pooled HTTP session (call on application shutdown).
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
     def call(self, prompt: str, model: str = None, max_tokens: int = 256) -> dict | str:
         """
         Synchronous wrapper for call_async.
         """
-        return asyncio.run(self.call_async(prompt, model=model, max_tokens=max_tokens))
+
+        async def _run():
+            # asyncio.run closes its loop, so don't leave the session dangling on it
+            try:
+                return await self.call_async(
+                    prompt, model=model, max_tokens=max_tokens
+                )
+            finally:
+                await self.aclose()
+
+        return asyncio.run(_run())
 
     async def call_json_async(self, prompt: str, model: str = None) -> dict:
         """
@@ -2,18 +2,50 @@
 #  PriceService (safe Yahoo Finance abstraction)
 # ---------------------------------------------------------
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
 import yfinance as yf
 from datetime import datetime, timedelta
-from functools import lru_cache
+from functools import cached_property, lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import time
 import random
 
+try:  # optional: fused multiply-reduce for large portfolios
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+try:  # optional: multi-threaded CSV parse + join for large portfolio files
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:  # optional: JIT-compiled profit/loss kernel for large portfolios
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+
+    @njit(parallel=True, cache=True)
+    def _pl_kernel(qty, cost, prices, out_pl):
+        for i in prange(qty.shape[0]):
+            out_pl[i] = (prices[i] - cost[i]) * qty[i]
+
+else:
+    _pl_kernel = None
+
 
 class PriceService:
     """Reliable Yahoo Finance fetcher with batching, retries, caching, and warnings."""
 
     MAX_BATCH = 50
+    MAX_WORKERS = 4
+    MAX_FALLBACK_WORKERS = 8
+    LATEST_TTL = 60  # seconds a latest-price lookup is reused
 
     # ---------------------------------------------------------
     # Retry helper
@@ -27,47 +59,68 @@ class PriceService:
     # ---------------------------------------------------------
     # Download helper with retries + batching
     # ---------------------------------------------------------
+    def _download_batch(self, batch, start=None, end=None):
+        """Download one batch with retries; empty DF if every attempt fails."""
+        for attempt in range(4):  # up to 4 retries
+            try:
+                raw = yf.download(
+                    batch,
+                    period="1d" if not start else None,
+                    start=start,
+                    end=end,
+                    progress=False,
+                    auto_adjust=False,
+                )
+                return raw if raw is not None else pd.DataFrame()
+            except Exception:
+                self._sleep_retry(attempt)
+
+        # If download fully failed → empty DF
+        return pd.DataFrame()
+
     def _safe_download(self, tickers, start=None, end=None):
-        """Download with retries + batching."""
+        """Download with retries + batching (batches fetched concurrently)."""
 
-        results = []
         batches = [
             tickers[i : i + self.MAX_BATCH]
             for i in range(0, len(tickers), self.MAX_BATCH)
         ]
 
-        for batch in batches:
-            raw = None
-            for attempt in range(4):  # up to 4 retries
-                try:
-                    raw = yf.download(
-                        batch,
-                        period="1d" if not start else None,
-                        start=start,
-                        end=end,
-                        progress=False,
-                        auto_adjust=False,
-                    )
-                    break
-                except Exception:
-                    self._sleep_retry(attempt)
-
-            # If download fully failed → empty DF
-            if raw is None:
-                results.append(pd.DataFrame())
-            else:
-                results.append(raw)
-
-        if len(results) == 1:
-            return results[0]
+        if not batches:
+            return pd.DataFrame()
+        if len(batches) == 1:
+            return self._download_batch(batches[0], start, end)
+
+        # yfinance is I/O-bound, so overlapping the HTTP calls cuts wall time
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(batches))) as ex:
+            results = list(
+                ex.map(lambda batch: self._download_batch(batch, start, end), batches)
+            )
 
         return pd.concat(results, axis=1)
 
     # ---------------------------------------------------------
     # Latest prices
     # ---------------------------------------------------------
-    @lru_cache(maxsize=5)
     def get_latest(self, tickers):
+        # Bucketing time into the cache key dedups bursts without serving stale prices
+        return self._get_latest_cached(tickers, int(time.time() // self.LATEST_TTL))
+
+    @lru_cache(maxsize=64)
+    def _get_latest_cached(self, tickers, time_bucket: int):
+        prices, warnings = self._latest_from_download(tickers)
+
+        # Recover tickers the batch download missed via the lightweight quote endpoint
+        missing = [t for t in tickers if prices[t] is None]
+        if missing:
+            for t, price in zip(missing, self._fast_last_prices(missing)):
+                if price is not None:
+                    prices[t] = price
+                    warnings.pop(t, None)
+
+        return prices, warnings
+
+    def _latest_from_download(self, tickers):
         raw = self._safe_download(tickers)
 
         if raw is None or raw.empty or "Close" not in raw:
@@ -94,6 +147,22 @@ class PriceService:
 
         return prices, warnings
 
+    @staticmethod
+    def _fast_last_price(ticker):
+        """Last price via `fast_info` (no heavy `.info` payload); None on error."""
+        try:
+            price = yf.Ticker(ticker).fast_info["last_price"]
+        except Exception:
+            return None
+        if price is None or pd.isna(price):
+            return None
+        return float(price)
+
+    def _fast_last_prices(self, tickers):
+        workers = min(self.MAX_FALLBACK_WORKERS, len(tickers))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(self._fast_last_price, tickers))
+
     # ---------------------------------------------------------
     # Historical prices
     # ---------------------------------------------------------
@@ -131,6 +200,50 @@ class PriceService:
         return prices, warnings
 
 
+# Column types for the multi-threaded Arrow CSV reader; other columns are inferred
+PORTFOLIO_COLUMN_TYPES = {
+    "Ticker": pa.string(),
+    "Cost_Basis": pa.float64(),
+    "Purchase_Date": pa.timestamp("s"),
+}
+
+
+def _read_csv(path, column_types=None) -> pd.DataFrame:
+    """Read a CSV with pyarrow; fall back to pandas if Arrow rejects the file."""
+    try:
+        # blank fields load as nulls, as they do with pd.read_csv and polars
+        options = pv.ConvertOptions(
+            column_types=column_types or {}, strings_can_be_null=True
+        )
+        table = pv.read_csv(path, convert_options=options)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pd.read_csv(path)
+    return table.to_pandas()
+
+
+def _load_with_polars(portfolio_csv, metadata_csv):
+    """Parse and left-join both CSVs in polars; None if polars is absent or fails."""
+    if pl is None:
+        return None
+    try:
+        upper = pl.col("Ticker").str.to_uppercase()
+        portfolio = pl.read_csv(portfolio_csv, try_parse_dates=True).with_columns(
+            upper, pl.col("Cost_Basis").cast(pl.Float64)
+        )
+        metadata = pl.read_csv(metadata_csv).with_columns(upper)
+        merged = portfolio.join(
+            metadata, on="Ticker", how="left", maintain_order="left"
+        )
+    except pl.exceptions.PolarsError:
+        return None
+    return merged.to_pandas(), metadata.to_pandas()
+
+
+# PriceService holds no per-instance state, so one shared instance lets its
+# method caches (keyed on self) survive PortfolioTool re-instantiation.
+_price_service = PriceService()
+
+
 # ---------------------------------------------------------
 #  PortfolioTool (updated to use PriceService)
 # ---------------------------------------------------------
@@ -141,23 +254,132 @@ class PortfolioTool:
     Portfolio analysis using CSVs + safe Yahoo price fetching.
     """
 
+    NUMEXPR_MIN_ROWS = 1000  # below this numexpr's thread start-up dominates
+    JIT_MIN_ROWS = 1000  # below this the NumPy expression is already fast
+
     def __init__(self, portfolio_csv: str, metadata_csv: str):
-        self.portfolio_df = pd.read_csv(portfolio_csv)
-        self.metadata_df = pd.read_csv(metadata_csv)
+        loaded = _load_with_polars(portfolio_csv, metadata_csv)
+        if loaded is None:
+            loaded = self._merge_frames(
+                _read_csv(portfolio_csv, PORTFOLIO_COLUMN_TYPES),
+                _read_csv(metadata_csv, {"Ticker": pa.string()}),
+            )
+        self._setup(*loaded)
+
+    @classmethod
+    def from_frames(cls, portfolio_df: pd.DataFrame, metadata_df: pd.DataFrame):
+        """Build from in-memory DataFrames, skipping CSV parsing entirely."""
+        tool = cls.__new__(cls)
+        tool._setup(*cls._merge_frames(portfolio_df, metadata_df))
+        return tool
+
+    @staticmethod
+    def _merge_frames(portfolio_df: pd.DataFrame, metadata_df: pd.DataFrame):
+        # normalise tickers once so lookups never re-uppercase the column
+        portfolio_df = portfolio_df.assign(Ticker=portfolio_df["Ticker"].str.upper())
+        metadata_df = metadata_df.assign(Ticker=metadata_df["Ticker"].str.upper())
 
         # merge metadata
-        self.portfolio_df = self.portfolio_df.merge(
-            self.metadata_df, on="Ticker", how="left"
+        merged = portfolio_df.merge(metadata_df, on="Ticker", how="left")
+        return merged, metadata_df
+
+    def _setup(self, portfolio_df: pd.DataFrame, metadata_df: pd.DataFrame):
+        self.portfolio_df = portfolio_df
+        self.metadata_df = metadata_df
+
+        # parse purchase dates once (skipped when the reader already typed them)
+        self._dates_sorted = False
+        if "Purchase_Date" in self.portfolio_df:
+            dates = self.portfolio_df["Purchase_Date"]
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = self._parse_dates(dates)
+                self.portfolio_df["Purchase_Date"] = dates
+            self._dates_sorted = dates.is_monotonic_increasing and not dates.hasnans
+
+        # few distinct sectors: integer category codes make the group-by cheap
+        if "Sector" in self.portfolio_df:
+            self.portfolio_df["Sector"] = self.portfolio_df["Sector"].astype("category")
+
+        # column arrays reused by every valuation call and ticker lookup
+        df = self.portfolio_df
+        self._tickers_arr = df["Ticker"].to_numpy()
+        self._qty = df["Quantity"].to_numpy()
+        self._cost = df["Cost_Basis"].to_numpy(dtype=float)
+        self._company = df["Company"].to_numpy() if "Company" in df else None
+        self._sector = self._sector_series(df).to_numpy()
+        self._dates = (
+            df["Purchase_Date"].dt.strftime("%Y-%m-%d").to_numpy()
+            if "Purchase_Date" in df
+            else None
         )
+        # handed out by get_profit_loss_columnar without copying, so freeze them
+        # (pandas < 3 returns writable views; a stray write would corrupt the tool)
+        for arr in (self._tickers_arr, self._qty, self._cost):
+            arr.setflags(write=False)
+        # ticker -> first row position; a ticker bought in several lots has
+        # several rows, so quantities are totalled per ticker up front
+        self._idx = {}
+        for i, t in enumerate(self._tickers_arr.tolist()):
+            self._idx.setdefault(t, i)
+        self._qty_total = df.groupby("Ticker", sort=False)["Quantity"].sum().to_dict()
+
+        # shared price service (its caches outlive this instance)
+        self.prices = _price_service
 
-        # new price service
-        self.prices = PriceService()
+    @staticmethod
+    def _parse_dates(values: pd.Series) -> pd.Series:
+        """ISO dates take the fast fixed-format path; anything else is inferred."""
+        try:
+            return pd.to_datetime(values, format="ISO8601", cache=True)
+        except (ValueError, TypeError):
+            return pd.to_datetime(values, format="mixed", cache=True)
 
     # ---------------------------------------------------------
     # BASIC STRUCTURE HELPERS
     # ---------------------------------------------------------
     def _tickers(self):
-        return self.portfolio_df["Ticker"].unique().tolist()
+        # dict keys keep first-seen order, matching Series.unique()
+        return list(self._idx)
+
+    def _records(self):
+        """Portfolio rows as dicts, with purchase dates rendered back as ISO strings."""
+        df = self.portfolio_df
+        if "Purchase_Date" in df:
+            df = df.assign(Purchase_Date=df["Purchase_Date"].dt.strftime("%Y-%m-%d"))
+        return df.to_dict(orient="records")
+
+    # ---------------------------------------------------------
+    # TICKER LOOKUPS
+    # ---------------------------------------------------------
+    def has_stock(self, ticker: str) -> bool:
+        return ticker.upper() in self._idx
+
+    def get_quantity(self, ticker: str):
+        """Total shares held across every lot of `ticker` (0 if not held)."""
+        return self._qty_total.get(ticker.upper(), 0)
+
+    def get_purchase_info(self, ticker: str):
+        """
+        Purchase details of the first lot of `ticker`, or None if it is not held.
+        Use get_quantity() for the total across lots.
+        """
+        i = self._idx.get(ticker.upper())
+        if i is None:
+            return None
+
+        def _value(arr):
+            if arr is None or pd.isna(arr[i]):
+                return None
+            return arr[i].item() if hasattr(arr[i], "item") else arr[i]
+
+        return {
+            "Ticker": self._tickers_arr[i],
+            "Company": _value(self._company),
+            "Sector": self._sector[i],
+            "Quantity": self._qty[i].item(),
+            "Cost_Basis": self._cost[i].item(),
+            "Purchase_Date": _value(self._dates),
+        }
 
     # ---------------------------------------------------------
     # UPDATED PRICE FETCHERS
@@ -171,95 +393,143 @@ class PortfolioTool:
     # ---------------------------------------------------------
     # ANALYSIS HELPERS
     # ---------------------------------------------------------
-    def get_current_value(self, price_lookup):
-        total = 0.0
-        for row in self.portfolio_df.itertuples():
-            price = price_lookup.get(row.Ticker, 0)
-            if price is not None:
-                total += row.Quantity * price
-        return total
+    def _sector_series(self, df: pd.DataFrame) -> pd.Series:
+        """Sector column with missing values (or a missing column) as 'Unknown'."""
+        if "Sector" not in df:
+            return pd.Series("Unknown", index=df.index)
+        sector = df["Sector"]
+        if isinstance(sector.dtype, pd.CategoricalDtype):
+            if not sector.hasnans:
+                return sector
+            if "Unknown" not in sector.cat.categories:
+                sector = sector.cat.add_categories("Unknown")
+        return sector.fillna("Unknown")
+
+    def _price_array(self, price_lookup) -> np.ndarray:
+        """Prices aligned with the portfolio rows (NaN where unpriced)."""
+        return np.array(
+            [price_lookup.get(t) for t in self._tickers_arr], dtype=float
+        )
 
-    def get_profit_loss(self, price_lookup):
-        result = {}
-        for row in self.portfolio_df.itertuples():
-            current = price_lookup.get(row.Ticker)
-            if current is None:
-                result[row.Ticker] = {
-                    "quantity": row.Quantity,
-                    "cost_basis": row.Cost_Basis,
-                    "current_price": None,
-                    "profit_loss": None,
-                }
-                continue
+    def get_current_value(self, price_lookup):
+        prices = np.nan_to_num(self._price_array(price_lookup))
+        return float(np.dot(self._qty, prices))
+
+    def get_profit_loss_columnar(self, price_lookup) -> dict:
+        """Per-row profit/loss as parallel arrays (NaN price/P&L where unpriced)."""
+        prices = self._price_array(price_lookup)
+        if _pl_kernel is not None and len(prices) >= self.JIT_MIN_ROWS:
+            # one fused pass, no temporaries for the price/cost difference
+            gains = np.empty_like(prices)
+            _pl_kernel(self._qty.astype(np.float64), self._cost, prices, gains)
+        else:
+            gains = (prices - self._cost) * self._qty
+
+        return {
+            "ticker": self._tickers_arr,
+            "quantity": self._qty,
+            "cost_basis": self._cost,
+            "current_price": prices,
+            "profit_loss": gains,
+        }
 
-            gain = (current - row.Cost_Basis) * row.Quantity
-            result[row.Ticker] = {
-                "quantity": row.Quantity,
-                "cost_basis": row.Cost_Basis,
-                "current_price": current,
-                "profit_loss": gain,
+    @staticmethod
+    def _profit_loss_by_ticker(columns: dict) -> dict:
+        """Nested {ticker: {...}} view of the columnar P&L (later rows win)."""
+        return {
+            t: {
+                "quantity": q,
+                "cost_basis": c,
+                "current_price": None if np.isnan(p) else p,
+                "profit_loss": None if np.isnan(g) else g,
             }
-        return result
+            for t, q, c, p, g in zip(
+                columns["ticker"].tolist(),
+                columns["quantity"].tolist(),
+                columns["cost_basis"].tolist(),
+                columns["current_price"].tolist(),
+                columns["profit_loss"].tolist(),
+            )
+        }
 
-    def get_sector_allocation(self):
-        df = self.portfolio_df
-        total_quantity = df["Quantity"].sum()
+    def get_profit_loss(self, price_lookup):
+        return self._profit_loss_by_ticker(self.get_profit_loss_columnar(price_lookup))
+
+    def _total_cost(self) -> float:
+        qty, cost = self._qty, self._cost
+        if ne is not None and len(qty) >= self.NUMEXPR_MIN_ROWS:
+            return float(ne.evaluate("sum(q * c)", local_dict={"q": qty, "c": cost}))
+        return float(np.dot(qty, cost))
+
+    @cached_property
+    def sector_allocation(self) -> dict:
+        """Sector -> % of total quantity; holdings are fixed, so computed once."""
+        total_quantity = self._qty.sum()
         if total_quantity == 0:
             return {}
 
-        allocation = {}
-        for row in df.itertuples():
-            sector = getattr(row, "Sector", "Unknown")
-            # Skip nan/None sectors
-            if sector is None or (isinstance(sector, float) and sector != sector):
-                sector = "Unknown"
-            allocation[sector] = allocation.get(sector, 0) + row.Quantity
-
-        return {s: round((q / total_quantity) * 100, 2) for s, q in allocation.items()}
-
-    def top_holdings(self, n: int = 5):
-        """Get top N holdings by current value"""
-        prices, _ = self.fetch_prices()
-
-        holdings = []
-        for row in self.portfolio_df.itertuples():
-            price = prices.get(row.Ticker)
-            if price is not None:
-                value = row.Quantity * price
-                holdings.append(
-                    {
-                        "ticker": row.Ticker,
-                        "quantity": row.Quantity,
-                        "price": price,
-                        "value": value,
-                        "sector": getattr(row, "Sector", "Unknown"),
-                    }
-                )
-
-        # Sort by value descending
-        holdings.sort(key=lambda x: x["value"], reverse=True)
+        # single Cython group-by over the cached quantities, one scaling pass
+        allocation = (
+            pd.Series(self._qty, index=self.portfolio_df.index)
+            .groupby(self._sector_series(self.portfolio_df), sort=False, observed=True)
+            .sum()
+            .mul(100.0 / total_quantity)
+            .round(2)
+        )
+        return dict(zip(allocation.index, allocation.tolist()))
 
-        return holdings[:n]
+    def get_sector_allocation(self):
+        # copy so callers can't mutate the cached result
+        return dict(self.sector_allocation)
+
+    def top_holdings(self, n: int = 5, price_lookup: dict = None):
+        """Get top N holdings by current value (reuses price_lookup if given)"""
+        if price_lookup is None:
+            price_lookup, _ = self.fetch_prices()
+
+        prices = self._price_array(price_lookup)
+        values = self._qty * prices
+
+        # unpriced holdings are skipped; only the top n rows get fully sorted
+        candidates = np.flatnonzero(~np.isnan(values))
+        if len(candidates) > 4 * n > 0:
+            part = np.argpartition(-values[candidates], n - 1)[:n]
+            candidates = np.sort(candidates[part])
+        order = candidates[np.argsort(-values[candidates], kind="stable")][:n]
+
+        return [
+            {
+                "ticker": self._tickers_arr[i],
+                "quantity": self._qty[i].item(),
+                "price": prices[i].item(),
+                "value": values[i].item(),
+                "sector": self._sector[i],
+            }
+            for i in order
+        ]
 
     def get_portfolio_summary(self):
         """Get full portfolio records"""
-        return self.portfolio_df.to_dict(orient="records")
+        return self._records()
 
     def filter_by_purchase_date(self, start_date: str, end_date: str):
         """Filter portfolio by purchase date range"""
-        df = self.portfolio_df.copy()
-        df["Purchase_Date"] = pd.to_datetime(df["Purchase_Date"])
+        dates = self.portfolio_df["Purchase_Date"]
         start = pd.to_datetime(start_date)
         end = pd.to_datetime(end_date)
 
-        filtered = df[(df["Purchase_Date"] >= start) & (df["Purchase_Date"] <= end)]
-        return filtered.to_dict(orient="records")
+        if self._dates_sorted:
+            # binary search the bounds instead of masking every row
+            lo = dates.searchsorted(start, side="left")
+            hi = dates.searchsorted(end, side="right")
+            return self.portfolio_df.iloc[lo:hi].to_dict(orient="records")
+
+        mask = (dates >= start) & (dates <= end)
+        return self.portfolio_df.loc[mask].to_dict(orient="records")
 
     def get_purchase_timeline(self):
         """Get purchases organized by date"""
-        df = self.portfolio_df.copy()
-        df["Purchase_Date"] = pd.to_datetime(df["Purchase_Date"])
-        df = df.sort_values("Purchase_Date")
+        df = self.portfolio_df.sort_values("Purchase_Date")
         return df[["Ticker", "Quantity", "Cost_Basis", "Purchase_Date"]].to_dict(
             orient="records"
         )
@@ -289,22 +559,27 @@ class PortfolioTool:
     # MAIN ANALYSIS
     # ---------------------------------------------------------
     def analyze(self, include_changes: str = None):
+        """
+        Full portfolio summary, built fresh on every call. Latest/historical
+        prices are already TTL-cached by PriceService, so no result cache here.
+        """
         tickers = self._tickers()
 
         prices, price_warnings = self.fetch_prices()
-        total_value = self.get_current_value(prices)
-        total_cost = float(
-            (self.portfolio_df["Quantity"] * self.portfolio_df["Cost_Basis"]).sum()
+        pl_columns = self.get_profit_loss_columnar(prices)
+        total_value = float(
+            np.dot(pl_columns["quantity"], np.nan_to_num(pl_columns["current_price"]))
         )
+        total_cost = self._total_cost()
 
         analysis = {
             "total_value": total_value,
             "total_cost": total_cost,
             "total_gain_loss": total_value - total_cost,
             "sector_allocation": self.get_sector_allocation(),
-            "profit_loss": self.get_profit_loss(prices),
+            "profit_loss": self._profit_loss_by_ticker(pl_columns),
             "warnings": price_warnings,
-            "portfolio": self.portfolio_df.to_dict(orient="records"),
+            "portfolio": self._records(),
         }
 
         if include_changes:
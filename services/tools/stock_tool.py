@@ -1,10 +1,33 @@
 # services/tools/stock_tool.py
+import numpy as np
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 from functools import lru_cache
 
 
+# ----------------------------------------------------------------------
+# MODULE-LEVEL HISTORY CACHE
+# ----------------------------------------------------------------------
+@lru_cache(maxsize=64)
+def _fetch_history(ticker: str, period: str = "1mo") -> pd.DataFrame:
+    """
+    Cached on (ticker, period) only, so every StockTool shares one cache.
+    Call _fetch_history.cache_clear() to reset it (e.g. between tests).
+    """
+    try:
+        stock = yf.Ticker(ticker)
+        data = stock.history(period=period)
+
+        if data.empty:
+            raise LookupError(f"No price data available for {ticker} during {period}")
+
+        return data
+
+    except Exception as e:
+        raise ConnectionError(f"Failed to fetch data for {ticker}: {e}")
+
+
 class StockTool:
     """
     Finance utility tool used by financial agents.
@@ -17,24 +40,11 @@ class StockTool:
     # ----------------------------------------------------------------------
     # INTERNAL DATA FETCHER (WITH CACHING)
     # ----------------------------------------------------------------------
-    @lru_cache(maxsize=64)
     def _fetch(self, ticker: str, period: str = "1mo") -> pd.DataFrame:
         """
-        Fetch data once and cache it.
+        Fetch data once and cache it (shared across StockTool instances).
         """
-        try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period=period)
-
-            if data.empty:
-                raise LookupError(
-                    f"No price data available for {ticker} during {period}"
-                )
-
-            return data
-
-        except Exception as e:
-            raise ConnectionError(f"Failed to fetch data for {ticker}: {e}")
+        return _fetch_history(ticker, period)
 
     # ----------------------------------------------------------------------
     # PUBLIC FUNCTIONS
@@ -46,6 +56,20 @@ class StockTool:
         data = self._fetch(ticker, period="5d")
         return float(data["Close"].iloc[-1])
 
+    def get_price_fast(self, ticker: str) -> float:
+        """
+        Latest traded price from `fast_info`, skipping the 5-day history download.
+        Falls back to get_price when Yahoo has no quote for the ticker.
+        """
+        try:
+            price = yf.Ticker(ticker).fast_info["last_price"]
+        except Exception:
+            price = None
+
+        if price is None or pd.isna(price):
+            return self.get_price(ticker)
+        return float(price)
+
     def get_historical(self, ticker: str, start: str, end: str) -> pd.DataFrame:
         """
         Get historical data over exact date range.
@@ -89,20 +113,50 @@ class StockTool:
         Rollup of core financial metrics for dashboard or MCP agent.
         """
         data = self._fetch(ticker, period="1mo")
+        return self._summary_from_frame(ticker, data)
+
+    def batch_summary(self, tickers: list) -> dict:
+        """
+        Summaries for many tickers from a single threaded yf.download call.
+        Tickers without usable data map to an {"error": ...} entry.
+        """
+        tickers = [t.upper() for t in tickers]
+        data = yf.download(
+            tickers, period="1mo", group_by="ticker", threads=True, progress=False
+        )
+
+        results = {}
+        for t in tickers:
+            try:
+                frame = data[t].dropna(subset=["Close"])
+                results[t] = self._summary_from_frame(t, frame)
+            except (KeyError, ValueError) as e:
+                results[t] = {"ticker": t, "error": f"No summary available: {e}"}
+        return results
+
+    @staticmethod
+    def _summary_from_frame(ticker: str, data: pd.DataFrame) -> dict:
+        """
+        Core metrics from one month of daily bars, in a single NumPy pass.
+        """
+        closes = data["Close"].to_numpy(dtype=float)
+        if len(closes) < 2:
+            raise ValueError(f"Not enough data to compute volatility for {ticker}")
 
-        current_price = float(data["Close"].iloc[-1])
-        ma_5 = float(data["Close"].tail(5).mean())
+        current_price = closes[-1]
+        ma_5 = closes[-5:].mean()
 
         # compute 1-month return
-        start_price = float(data["Close"].iloc[0])
+        start_price = closes[0]
         one_month_return = ((current_price - start_price) / start_price) * 100
 
-        volatility = self.compute_volatility(ticker)
+        returns = np.diff(closes) / closes[:-1]
+        volatility = returns.std(ddof=1) * np.sqrt(252)
 
         return {
             "ticker": ticker.upper(),
-            "current_price": round(current_price, 2),
-            "5_day_moving_avg": round(ma_5, 2),
-            "1_month_return_pct": round(one_month_return, 2),
-            "volatility": round(volatility, 4),
+            "current_price": round(float(current_price), 2),
+            "5_day_moving_avg": round(float(ma_5), 2),
+            "1_month_return_pct": round(float(one_month_return), 2),
+            "volatility": round(float(volatility), 4),
         }
@@ -1,5 +1,8 @@
 # services/tools/websearch_tool.py
 import os
+import time
+from functools import lru_cache
+
 import requests
 from dotenv import load_dotenv
 
@@ -10,12 +13,22 @@ load_dotenv()
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
 
-def search_financial_news(query: str, max_results=5):
-    """
-    Search for financial news using NewsAPI.
-    Returns a summary of top articles with sources.
-    """
-    url = "https://newsapi.org/v2/everything"
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+REQUEST_TIMEOUT = 5  # seconds
+CACHE_TTL = 300  # seconds a query's articles are reused
+
+# one pooled session so repeated searches reuse the TCP/TLS connection
+_session = requests.Session()
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=8))
+
+
+class NewsFetchError(Exception):
+    """NewsAPI did not return a usable response (never cached)."""
+
+
+@lru_cache(maxsize=128)
+def _fetch_articles(query: str, max_results: int, time_bucket: int) -> tuple:
+    """`time_bucket` only varies the cache key so entries expire after CACHE_TTL."""
     params = {
         "q": query,
         "language": "en",
@@ -24,30 +37,37 @@ def search_financial_news(query: str, max_results=5):
         "apiKey": NEWS_API_KEY,
     }
 
-    response = requests.get(url, params=params)
+    try:
+        response = _session.get(NEWS_API_URL, params=params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        raise NewsFetchError(str(e)) from e
     if response.status_code != 200:
+        raise NewsFetchError(f"NewsAPI returned {response.status_code}")
+
+    return tuple(response.json().get("articles", []))
+
+
+def search_financial_news(query: str, max_results=5):
+    """
+    Search for financial news using NewsAPI.
+    Returns a summary of top articles with sources.
+    """
+    try:
+        articles = _fetch_articles(query, max_results, int(time.time() // CACHE_TTL))
+    except NewsFetchError:
         return "Could not fetch news at this time."
 
-    data = response.json()
-    articles = data.get("articles", [])
     if not articles:
         return "No recent news found for your query."
 
-    # Build summary
-    summary_lines = []
-    sources = []
-    for article in articles:
-        title = article.get("title", "No title")
-        desc = article.get("description", "")
-        url = article.get("url", "")
-        summary_lines.append(f"- {desc or title}")
-        sources.append(url)
-
-    summary_text = "\n".join(summary_lines)
-    sources_text = "\n".join(
-        [f"[Source {i+1}]({url})" for i, url in enumerate(sources)]
-    )
-
+    # Build summary: one (line, url) pair per article, joined once per section
+    items = [
+        (a.get("description") or a.get("title", "No title"), a.get("url", ""))
+        for a in articles
+    ]
     return (
-        f"**Latest news highlights:**\n{summary_text}\n\n**Sources:**\n{sources_text}"
+        "**Latest news highlights:**\n"
+        + "\n".join(f"- {text}" for text, _ in items)
+        + "\n\n**Sources:**\n"
+        + "\n".join(f"[Source {i}]({url})" for i, (_, url) in enumerate(items, 1))
     )
@@ -0,0 +1,118 @@
+# tests/conftest.py
+# Session-scoped fixtures shared by the tool tests, so running the whole
+# tests/ directory builds each frame / tool / fake response only once.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+# ----------------------------------------------------------------------
+# Stock history (test_stock_tool.py)
+# ----------------------------------------------------------------------
+@pytest.fixture(scope="session")
+def history_df():
+    return pd.DataFrame(
+        {
+            "Close": np.array([100, 102, 101, 103, 104], dtype=np.float64),
+            "Open": np.array([99, 101, 100, 102, 103], dtype=np.float64),
+        }
+    )
+
+
+# ----------------------------------------------------------------------
+# Portfolio data (test_portfolio_tool.py)
+# ----------------------------------------------------------------------
+@pytest.fixture(scope="session")
+def portfolio_frames():
+    # column-major (one contiguous array per column), like the tool's cached arrays
+    portfolio_df = pd.DataFrame(
+        {
+            "Ticker": np.array(["AAPL", "MSFT"], dtype=object),
+            "Quantity": np.array([10, 5], dtype=np.int64),
+            "Cost_Basis": np.array([100.0, 200.0], dtype=np.float64),
+            # parsed once here, so building the tool never re-parses date strings
+            "Purchase_Date": pd.to_datetime(
+                ["2021-01-01", "2022-01-01"], format="%Y-%m-%d", cache=True
+            ),
+        }
+    )
+    metadata_df = pd.DataFrame(
+        {
+            "Ticker": np.array(["AAPL", "MSFT"], dtype=object),
+            "Company": np.array(["Apple Inc", "Microsoft Corp"], dtype=object),
+            "Sector": np.array(["Tech", "Tech"], dtype=object),
+        }
+    )
+    return portfolio_df, metadata_df
+
+
+@pytest.fixture(scope="session")
+def sample_portfolio_csv(tmp_path_factory, portfolio_frames):
+    p = tmp_path_factory.mktemp("pf") / "portfolio.csv"
+    portfolio_frames[0].to_csv(p, index=False)
+    return p
+
+
+@pytest.fixture(scope="session")
+def sample_metadata_csv(tmp_path_factory, portfolio_frames):
+    p = tmp_path_factory.mktemp("pf") / "metadata.csv"
+    portfolio_frames[1].to_csv(p, index=False)
+    return p
+
+
+@pytest.fixture(scope="session")
+def portfolio_tool(portfolio_frames):
+    # imported lazily so test modules that don't need it never pay for yfinance
+    from services.tools.portfolio_tool import PortfolioTool
+
+    # built straight from the frames: no CSV write/parse round trip
+    portfolio_df, metadata_df = portfolio_frames
+    return PortfolioTool.from_frames(portfolio_df.copy(), metadata_df.copy())
+
+
+# ----------------------------------------------------------------------
+# NewsAPI responses (test_websearch.py)
+# ----------------------------------------------------------------------
+class _Resp:
+    """Minimal stand-in for requests.Response."""
+
+    __slots__ = ("status_code", "_payload")
+
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture(scope="session")
+def mock_response_success():
+    return _Resp(
+        200,
+        {
+            "articles": [
+                {
+                    "title": "Stock rises",
+                    "description": "Stock XYZ rises 5%",
+                    "url": "https://example.com/1",
+                },
+                {
+                    "title": "Market update",
+                    "description": "",
+                    "url": "https://example.com/2",
+                },
+            ]
+        },
+    )
+
+
+@pytest.fixture(scope="session")
+def mock_response_empty():
+    return _Resp(200, {"articles": []})
+
+
+@pytest.fixture(scope="session")
+def mock_response_fail():
+    return _Resp(500)
@@ -0,0 +1,48 @@
+# tests/test_chunking.py
+import pytest
+
+from services.rag.chunking import chunk_text, iter_chunks, stream_chunks, write_chunks
+
+TEXT = "".join(chr(ord("a") + i % 26) for i in range(5000))
+
+
+# ----------------------------------------------------------------------
+# stream_chunks must match chunk_text on the concatenated pieces
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize(
+    "piece_len, chunk_size, overlap",
+    [
+        (1, 50, 10),  # many tiny pieces
+        (37, 50, 10),  # pieces not aligned to chunks
+        (800, 500, 100),  # pieces larger than a chunk
+        (5000, 1200, 200),  # whole document in one piece
+        (100, 100, 0),  # no overlap, exact fit
+    ],
+)
+def test_stream_chunks_matches_chunk_text(piece_len, chunk_size, overlap):
+    pieces = (TEXT[i : i + piece_len] for i in range(0, len(TEXT), piece_len))
+    assert list(stream_chunks(pieces, chunk_size, overlap)) == chunk_text(
+        TEXT, chunk_size, overlap
+    )
+
+
+def test_stream_chunks_empty():
+    assert list(stream_chunks(iter([]), 50, 10)) == chunk_text("", 50, 10) == []
+
+
+# ----------------------------------------------------------------------
+# write_chunks -> iter_chunks round trip through one JSONL file
+# ----------------------------------------------------------------------
+def test_write_then_iter_chunks(tmp_path):
+    path = tmp_path / "doc_chunks.jsonl"
+    chunks = ["first", 'quote " and\nnewline', "third"]
+
+    assert write_chunks((c for c in chunks), path) == 3
+    assert list(iter_chunks(path)) == chunks
+
+
+def test_write_chunks_empty_generator(tmp_path):
+    path = tmp_path / "empty_chunks.jsonl"
+
+    assert write_chunks(iter([]), path) == 0
+    assert list(iter_chunks(path)) == []
@@ -0,0 +1,50 @@
+# tests/test_groq_wrapper.py
+# python -m pytest tests/test_groq_wrapper.py -vv
+
+import asyncio
+import threading
+
+import pytest
+
+from services.tools.groq_wrapper import GroqLLM
+
+
+@pytest.fixture
+def llm():
+    llm = GroqLLM(api_key="test")
+    yield llm
+    asyncio.run(llm.aclose())
+
+
+async def _session(llm):
+    return llm._get_session()
+
+
+# ----------------------------------------------------------------------
+# TEST: a session bound to another loop is released, not leaked
+# ----------------------------------------------------------------------
+def test_session_from_finished_loop_is_detached(llm):
+    first = asyncio.run(_session(llm))
+    second = asyncio.run(_session(llm))
+
+    assert second is not first
+    assert first.closed
+    assert not second.closed
+
+
+def test_session_on_running_loop_is_closed_there(llm):
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    try:
+        first = asyncio.run_coroutine_threadsafe(_session(llm), other).result()
+        second = asyncio.run(_session(llm))
+
+        # the close was scheduled on the other loop; let it run
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01), other).result()
+        assert first.closed
+        assert second is not first
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join()
+        other.close()
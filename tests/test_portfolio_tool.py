@@ -1,42 +1,91 @@
+import copy
+from types import SimpleNamespace
+
 import pandas as pd
 import pytest
 from unittest.mock import patch
+from services.tools import portfolio_tool as portfolio_module
 from services.tools.portfolio_tool import PortfolioTool
 
 
 # python -m pytest tests/test_portfolio_agent.py -vv
-@pytest.fixture
-def sample_portfolio_csv(tmp_path):
-    p = tmp_path / "portfolio.csv"
-    df = pd.DataFrame(
-        {
-            "Ticker": ["AAPL", "MSFT"],
-            "Quantity": [10, 5],
-            "Cost_Basis": [100.0, 200.0],
-            "Purchase_Date": ["2021-01-01", "2022-01-01"],
-        }
-    )
-    df.to_csv(p, index=False)
-    return p
+# analyze() expectations for the conftest frames at AAPL=150, MSFT=250
+EXPECTED_TOTAL_COST = 10 * 100 + 5 * 200  # 2000
+EXPECTED_TOTAL_VALUE = 10 * 150 + 5 * 250  # 2750
+
+
+@pytest.fixture(autouse=True)
+def clear_price_cache():
+    # the price service is module-level, so its lru_caches outlive each test
+    service = portfolio_module._price_service
+    service._get_latest_cached.cache_clear()
+    service.get_historical.cache_clear()
+    yield
+    service._get_latest_cached.cache_clear()
+    service.get_historical.cache_clear()
 
 
 @pytest.fixture
-def sample_metadata_csv(tmp_path):
-    p = tmp_path / "metadata.csv"
-    df = pd.DataFrame(
-        {
-            "Ticker": ["AAPL", "MSFT"],
-            "Company": ["Apple Inc", "Microsoft Corp"],
-            "Sector": ["Tech", "Tech"],
-        }
+def tool(portfolio_tool):
+    # shallow copy so per-test attribute changes don't leak between tests
+    return copy.copy(portfolio_tool)
+
+
+def test_from_csv_matches_from_frames(sample_portfolio_csv, sample_metadata_csv, tool):
+    csv_tool = PortfolioTool(sample_portfolio_csv, sample_metadata_csv)
+    assert csv_tool.get_portfolio_summary() == tool.get_portfolio_summary()
+
+
+@pytest.mark.parametrize("use_polars", [True, False], ids=["polars", "arrow"])
+def test_us_format_purchase_dates(
+    monkeypatch, tmp_path, sample_metadata_csv, use_polars
+):
+    if not use_polars:
+        monkeypatch.setattr(portfolio_module, "pl", None)
+    csv = tmp_path / "portfolio_us.csv"
+    csv.write_text(
+        "Ticker,Quantity,Cost_Basis,Purchase_Date\n"
+        "AAPL,10,100.0,01/15/2021\n"
+        "MSFT,5,200.0,03/02/2022\n"
     )
-    df.to_csv(p, index=False)
-    return p
 
+    us_tool = PortfolioTool(csv, sample_metadata_csv)
+    rows = us_tool.filter_by_purchase_date("2021-01-01", "2021-12-31")
+    assert [r["Ticker"] for r in rows] == ["AAPL"]
+    assert us_tool.get_purchase_info("MSFT")["Purchase_Date"] == "2022-03-02"
 
-@pytest.fixture
-def tool(sample_portfolio_csv, sample_metadata_csv):
-    return PortfolioTool(sample_portfolio_csv, sample_metadata_csv)
+
+@pytest.mark.parametrize("use_polars", [True, False], ids=["polars", "arrow"])
+def test_blank_metadata_fields_are_missing(
+    monkeypatch, tmp_path, sample_portfolio_csv, use_polars
+):
+    if not use_polars:
+        monkeypatch.setattr(portfolio_module, "pl", None)
+    csv = tmp_path / "metadata_blank.csv"
+    csv.write_text("Ticker,Company,Sector\nAAPL,Apple Inc,Tech\nMSFT,,\n")
+
+    blank_tool = PortfolioTool(sample_portfolio_csv, csv)
+    assert blank_tool.get_sector_allocation() == {"Tech": 66.67, "Unknown": 33.33}
+    assert blank_tool.get_purchase_info("msft")["Company"] is None
+
+
+def test_csv_loading_uses_arrow_reader(
+    monkeypatch, sample_portfolio_csv, sample_metadata_csv
+):
+    # without polars, both CSVs must go through pyarrow.csv (typed, no re-parse)
+    monkeypatch.setattr(portfolio_module, "pl", None)
+    read_csv = portfolio_module.pv.read_csv
+    calls = []
+
+    def spy(path, *args, **kwargs):
+        calls.append(path)
+        return read_csv(path, *args, **kwargs)
+
+    monkeypatch.setattr(portfolio_module.pv, "read_csv", spy)
+
+    tool = PortfolioTool(sample_portfolio_csv, sample_metadata_csv)
+    assert calls == [sample_portfolio_csv, sample_metadata_csv]
+    assert pd.api.types.is_datetime64_any_dtype(tool.portfolio_df["Purchase_Date"])
 
 
 def test_has_stock(tool):
@@ -57,32 +106,134 @@ def test_get_purchase_info(tool):
     assert info["Cost_Basis"] == 100.0
 
 
+def test_repeated_ticker_lots(portfolio_frames):
+    portfolio_df, metadata_df = portfolio_frames
+    lots = pd.concat([portfolio_df, portfolio_df.iloc[[0]]], ignore_index=True)
+    lots.loc[2, ["Quantity", "Cost_Basis"]] = [7, 120.0]
+    multi = PortfolioTool.from_frames(lots, metadata_df.copy())
+
+    assert multi.get_quantity("AAPL") == 17  # 10 + 7 across both lots
+    assert multi.get_purchase_info("AAPL")["Cost_Basis"] == 100.0  # first lot
+
+
+def test_columnar_arrays_are_read_only(tool):
+    columns = tool.get_profit_loss_columnar({"AAPL": 150.0, "MSFT": 250.0})
+    for name in ("ticker", "quantity", "cost_basis"):
+        with pytest.raises(ValueError):
+            columns[name][0] = 0
+
+    assert tool.get_quantity("AAPL") == 10
+    assert tool.get_current_value({"AAPL": 150.0, "MSFT": 250.0}) == 2750.0
+
+
 def test_get_sector_allocation(tool):
     alloc = tool.get_sector_allocation()
     assert alloc["Tech"] == 100.0  # Both stocks are tech
 
 
+def test_sector_allocation_is_computed_once(monkeypatch, portfolio_frames):
+    portfolio_df, metadata_df = portfolio_frames
+    fresh = PortfolioTool.from_frames(portfolio_df.copy(), metadata_df.copy())
+    sector_series = fresh._sector_series
+    calls = []
+
+    def spy(df):
+        calls.append(df)
+        return sector_series(df)
+
+    monkeypatch.setattr(fresh, "_sector_series", spy)
+
+    assert fresh.get_sector_allocation() == fresh.get_sector_allocation()
+    assert len(calls) == 1
+
+
 def test_filter_by_purchase_date(tool):
-    df = tool.filter_by_purchase_date("2021-01-01", "2021-12-31")
-    assert len(df) == 1
-    assert df.iloc[0]["Ticker"] == "AAPL"
+    assert tool._dates_sorted  # fixture dates are ascending: searchsorted path
+    rows = tool.filter_by_purchase_date("2021-01-01", "2021-12-31")
+    assert len(rows) == 1
+    assert rows[0]["Ticker"] == "AAPL"
 
 
 @patch("services.tools.portfolio_tool.yf.Ticker")
-def test_fetch_prices(mock_yf, tool):
-    mock_yf.return_value.info = {"regularMarketPrice": 150}
-    prices = tool.fetch_prices()
-    assert prices["AAPL"] == 150
-    assert prices["MSFT"] == 150
+@patch("services.tools.portfolio_tool.yf.download")
+def test_fetch_prices(mock_download, mock_ticker, tool):
+    # batch download only has AAPL; MSFT must come from the fast_info fallback
+    mock_download.return_value = pd.DataFrame({("Close", "AAPL"): [148.0, 150.0]})
+    mock_ticker.return_value.fast_info = {"last_price": 250.0}
+
+    prices, warnings = tool.fetch_prices()
+
+    assert prices == {"AAPL": 150.0, "MSFT": 250.0}
+    assert warnings == {}
+    mock_ticker.assert_called_once_with("MSFT")
+
+
+@patch("services.tools.portfolio_tool.yf.download")
+def test_latest_prices_cached_per_time_bucket(mock_download, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(
+        portfolio_module, "time", SimpleNamespace(time=lambda: clock[0])
+    )
+    mock_download.return_value = pd.DataFrame({("Close", "AAPL"): [150.0]})
+    service = portfolio_module._price_service
+    ttl = portfolio_module.PriceService.LATEST_TTL
+
+    first = service.get_latest(("AAPL",))
+    clock[0] = ttl - 1  # same bucket: cache hit
+    assert service.get_latest(("AAPL",)) is first
+    assert mock_download.call_count == 1
+
+    clock[0] = ttl  # next bucket: refetch
+    mock_download.return_value = pd.DataFrame({("Close", "AAPL"): [151.0]})
+    assert service.get_latest(("AAPL",)) == ({"AAPL": 151.0}, {})
+    assert mock_download.call_count == 2
+
+
+def _fake_download(tickers, **kwargs):
+    if "BAD" in tickers:
+        raise ConnectionError("batch failed")
+    return pd.DataFrame({("Close", t): [1.0, float(len(t))] for t in tickers})
+
+
+@pytest.fixture
+def batched_service(monkeypatch):
+    service = portfolio_module.PriceService()
+    monkeypatch.setattr(service, "MAX_BATCH", 2)
+    monkeypatch.setattr(service, "_sleep_retry", lambda attempt: None)
+    monkeypatch.setattr(portfolio_module.yf, "download", _fake_download)
+    return service
+
+
+def test_safe_download_concatenates_batches(batched_service):
+    tickers = ["A", "BB", "CCC", "DDDD", "EEEEE"]  # three batches of <= 2
+
+    raw = batched_service._safe_download(tickers)
+
+    assert raw["Close"].columns.tolist() == tickers
+    assert raw["Close"].iloc[-1].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_failed_batch_keeps_other_batches(batched_service):
+    tickers = ("A", "BB", "BAD", "X", "YY")  # batches: [A, BB] [BAD, X] [YY]
+
+    prices, warnings = batched_service._latest_from_download(tickers)
+
+    assert prices == {"A": 1.0, "BB": 2.0, "BAD": None, "X": None, "YY": 2.0}
+    assert set(warnings) == {"BAD", "X"}
 
 
 @patch("services.tools.portfolio_tool.PortfolioTool.fetch_prices")
 def test_analyze(mock_fetch, tool):
-    mock_fetch.return_value = {"AAPL": 150, "MSFT": 250}
+    # fetch_prices returns (prices, warnings)
+    mock_fetch.return_value = ({"AAPL": 150, "MSFT": 250}, {})
 
     result = tool.analyze()
 
-    assert result["total_cost"] == (10 * 100 + 5 * 200)
-    assert result["total_value"] == (10 * 150 + 5 * 250)
+    assert result["total_cost"] == EXPECTED_TOTAL_COST
+    assert result["total_value"] == EXPECTED_TOTAL_VALUE
     assert "sector_allocation" in result
-    assert "profit_loss_details" in result
+    assert "profit_loss" in result
+
+    # each call builds its own result, so mutating one can't leak into the next
+    result["sector_allocation"].clear()
+    assert tool.analyze()["sector_allocation"]
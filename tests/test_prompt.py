@@ -0,0 +1,47 @@
+# tests/test_prompt.py
+from services.rag.prompt import build_prompt
+
+
+def _hit(source, score, content):
+    return {
+        "score": score,
+        "metadata": {"chunk_id": 0, "meta": {"source": source}, "content": content},
+    }
+
+
+# ----------------------------------------------------------------------
+# TEST: sources are added best score first
+# ----------------------------------------------------------------------
+def test_sources_ordered_by_score():
+    hits = [_hit("low.pdf", 0.1, "low"), _hit("high.pdf", 0.9, "high")]
+    prompt = build_prompt("q?", hits)
+
+    assert prompt.index("[0] Source: high.pdf") < prompt.index("[1] Source: low.pdf")
+    assert prompt.endswith("\nQuestion:\nq?\n\nAnswer:")
+
+
+# ----------------------------------------------------------------------
+# TEST: budget trims the last source that fits and drops the rest
+# ----------------------------------------------------------------------
+def test_budget_trims_then_drops():
+    hits = [
+        _hit("a.pdf", 0.9, "A" * 300),
+        _hit("b.pdf", 0.5, "B" * 300),
+        _hit("c.pdf", 0.1, "C" * 300),
+    ]
+    prompt = build_prompt("q?", hits, system_instructions="sys", max_chars=700)
+
+    assert len(prompt) <= 700
+    assert "A" * 300 in prompt
+    assert 0 < prompt.count("B") < 300  # trimmed to the remaining room
+    assert "c.pdf" not in prompt
+
+
+def test_oversized_system_instructions_keeps_question():
+    system = "S" * 500
+    prompt = build_prompt("q?", [_hit("a.pdf", 0.9, "A" * 50)], system, max_chars=200)
+
+    # no room for sources; instructions and question are never cut
+    assert "Source:" not in prompt
+    assert prompt.startswith(system)
+    assert prompt.endswith("\nQuestion:\nq?\n\nAnswer:")
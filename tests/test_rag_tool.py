@@ -0,0 +1,123 @@
+# tests/test_rag_tool.py
+# python -m pytest tests/test_rag_tool.py -vv
+
+import pytest
+
+# rag_tool pulls in the embedding/PDF stack at import time
+pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("PyPDF2")
+
+from services.rag import rag_tool as rag_module  # noqa: E402
+from services.rag.rag_tool import POOL_MIN_FILES, RAGTool  # noqa: E402
+
+
+class _FakeIndex:
+    """In-memory stand-in for FaissIndex: records rows and saves, no model."""
+
+    def __init__(self, *args, **kwargs):
+        self.rows = []
+        self.saves = 0
+
+    @property
+    def doc_ids(self):
+        return {md["doc_id"] for md in self.rows}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, texts, metadatas):
+        self.rows.extend(metadatas)
+
+    def truncate(self, n):
+        del self.rows[n:]
+
+    def save(self, path):
+        self.saves += 1
+
+
+@pytest.fixture
+def rag(monkeypatch, tmp_path):
+    monkeypatch.setattr(rag_module, "FaissIndex", _FakeIndex)
+    # deterministic ingest order (rglob follows directory order)
+    list_files = rag_module.list_files
+    monkeypatch.setattr(
+        rag_module, "list_files", lambda d, exts=None: sorted(list_files(d, exts))
+    )
+    return RAGTool(
+        data_dir=tmp_path / "data",
+        index_dir=tmp_path / "index",
+        chunk_size=50,
+        chunk_overlap=10,
+        groq_api_key="test",
+    )
+
+
+def _write_docs(directory, stems):
+    directory.mkdir(parents=True, exist_ok=True)
+    for stem in stems:
+        (directory / f"{stem}.csv").write_text(f"ticker,note\n{stem},{'x' * 80}\n")
+    return directory
+
+
+# ----------------------------------------------------------------------
+# TEST: add_directory (pooled and serial paths)
+# ----------------------------------------------------------------------
+def test_add_directory_pooled(monkeypatch, rag, tmp_path):
+    stems = [f"doc{i}" for i in range(POOL_MIN_FILES)]
+    data_dir = _write_docs(tmp_path / "docs", stems)
+    (data_dir / "doc0.json").write_text('{"dup": true}')  # same stem as doc0.csv
+
+    pooled = []
+    add_pooled = rag._add_files_pooled
+
+    def spy(files, workers):
+        pooled.append(workers)
+        return add_pooled(files, workers)
+
+    monkeypatch.setattr(rag, "_add_files_pooled", spy)
+
+    rag.add_directory(data_dir, workers=2)
+
+    assert pooled == [2]
+    assert rag._ingested_ids == set(stems)
+    assert rag.index.doc_ids == set(stems)
+    # the doc0 duplicate contributes no rows of its own
+    assert {md["meta"]["source"] for md in rag.index.rows} == {
+        f"{s}.csv" for s in stems
+    }
+    assert rag.index.saves == 1
+
+
+def test_add_directory_serial_below_threshold(monkeypatch, rag, tmp_path):
+    data_dir = _write_docs(tmp_path / "docs", ["a", "b"])
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool used below POOL_MIN_FILES")
+
+    monkeypatch.setattr(rag_module, "ProcessPoolExecutor", no_pool)
+
+    rag.add_directory(data_dir, workers=2)
+
+    assert rag._ingested_ids == {"a", "b"}
+    assert rag.index.saves == 1
+
+
+def test_add_directory_saves_progress_before_raising(monkeypatch, rag, tmp_path):
+    data_dir = _write_docs(tmp_path / "docs", ["a_good", "b_bad"])
+    iter_file_chunks = rag_module.iter_file_chunks
+
+    def failing(path, *args):
+        if "b_bad" in str(path):
+            raise ValueError("corrupt file")
+        return iter_file_chunks(path, *args)
+
+    monkeypatch.setattr(rag_module, "iter_file_chunks", failing)
+
+    with pytest.raises(ValueError, match="corrupt file"):
+        rag.add_directory(data_dir)
+
+    # the file ingested before the failure is kept and persisted
+    assert rag._ingested_ids == {"a_good"}
+    assert rag.index.doc_ids == {"a_good"}
+    assert rag.index.saves == 1
@@ -2,112 +2,139 @@
 # python -m pytest tests/test_stock_tool.py -vv
 
 import pytest
+import numpy as np
 import pandas as pd
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 
-from services.tools.stock_tool import StockTool
+# imported once up front (skip cleanly if absent) so patch targets resolve by
+# plain attribute lookup instead of triggering the lazy yfinance import
+yf = pytest.importorskip("yfinance")
 
+from services.tools.stock_tool import StockTool, _fetch_history  # noqa: E402
 
-# Helper DataFrame for mocking yfinance returns
-def mock_history_df():
-    return pd.DataFrame(
-        {"Close": [100, 102, 101, 103, 104], "Open": [99, 101, 100, 102, 103]}
-    )
 
+@pytest.fixture(autouse=True)
+def clear_history_cache():
+    # the history cache is module-level, so mocked frames must not leak
+    _fetch_history.cache_clear()
+    yield
+    _fetch_history.cache_clear()
 
-# ----------------------------------------------------------------------
-# TEST: get_price
-# ----------------------------------------------------------------------
-@patch("yfinance.Ticker")
-def test_get_price(mock_ticker):
-    mock_obj = MagicMock()
-    mock_obj.history.return_value = mock_history_df()
-    mock_ticker.return_value = mock_obj
 
-    tool = StockTool()
-    price = tool.get_price("AAPL")
+@pytest.fixture(scope="session")
+def shared_tool():
+    # StockTool is stateless; its history cache is reset by clear_history_cache
+    return StockTool()
 
-    assert price == 104.0
 
+@pytest.fixture
+def mock_ticker(monkeypatch, history_df):
+    # spec'd so only real Ticker attributes exist (typos fail loudly)
+    mock_obj = MagicMock(spec=yf.Ticker)
+    mock_obj.history.return_value = history_df.copy(deep=False)
+    monkeypatch.setattr("services.tools.stock_tool.yf.Ticker", lambda *a, **k: mock_obj)
+    return mock_obj
 
-# ----------------------------------------------------------------------
-# TEST: historical data
-# ----------------------------------------------------------------------
-@patch("yfinance.Ticker")
-def test_get_historical(mock_ticker):
-    mock_obj = MagicMock()
-    mock_obj.history.return_value = mock_history_df()
-    mock_ticker.return_value = mock_obj
 
-    tool = StockTool()
-    df = tool.get_historical("MSFT", "2024-01-01", "2024-02-01")
+@pytest.fixture
+def stock_tool(mock_ticker, shared_tool):
+    # depends on mock_ticker so no test using the tool can reach Yahoo
+    return shared_tool
 
-    assert isinstance(df, pd.DataFrame)
-    assert "Close" in df.columns
+
+@pytest.fixture
+def close(history_df):
+    # the same float64 close array the tool sees, for derived expectations
+    return history_df["Close"].to_numpy()
 
 
 # ----------------------------------------------------------------------
-# TEST: moving average
+# TEST: public metrics, against closes 100, 102, 101, 103, 104
 # ----------------------------------------------------------------------
-@patch("yfinance.Ticker")
-def test_compute_moving_average(mock_ticker):
-    mock_obj = MagicMock()
-    mock_obj.history.return_value = mock_history_df()
-    mock_ticker.return_value = mock_obj
+def test_get_price(stock_tool, close):
+    assert stock_tool.get_price("AAPL") == close[-1] == 104.0
 
-    tool = StockTool()
-    ma = tool.compute_moving_average("TSLA", period=5)
 
-    expected = sum([100, 102, 101, 103, 104]) / 5
-    assert ma == expected
+def test_get_price_fast_reads_fast_info(stock_tool, mock_ticker):
+    mock_ticker.fast_info = {"last_price": 105.5}
 
+    assert stock_tool.get_price_fast("AAPL") == 105.5
+    mock_ticker.history.assert_not_called()  # no history download on the fast path
 
-# ----------------------------------------------------------------------
-# TEST: volatility
-# ----------------------------------------------------------------------
-@patch("yfinance.Ticker")
-def test_compute_volatility(mock_ticker):
-    mock_obj = MagicMock()
-    mock_obj.history.return_value = mock_history_df()
-    mock_ticker.return_value = mock_obj
 
-    tool = StockTool()
-    vol = tool.compute_volatility("AMZN")
+def _raising_fast_info():
+    info = MagicMock()
+    info.__getitem__.side_effect = KeyError("last_price")
+    return info
+
+
+@pytest.mark.parametrize(
+    "fast_info",
+    [{"last_price": None}, {"last_price": float("nan")}, _raising_fast_info()],
+    ids=["none", "nan", "raises"],
+)
+def test_get_price_fast_falls_back_to_history(stock_tool, mock_ticker, fast_info):
+    mock_ticker.fast_info = fast_info
+
+    assert stock_tool.get_price_fast("AAPL") == 104.0  # last close via get_price
+    mock_ticker.history.assert_called_once_with(period="5d")
 
-    assert vol > 0
+
+def test_get_historical(stock_tool, close):
+    df = stock_tool.get_historical("MSFT", "2024-01-01", "2024-02-01")
+    assert isinstance(df, pd.DataFrame)
+    assert np.array_equal(df["Close"].to_numpy(), close)
+
+
+def test_compute_moving_average(stock_tool, close):
+    assert stock_tool.compute_moving_average("TSLA", 5) == close[-5:].mean() == 102.0
+
+
+def test_compute_volatility(stock_tool):
+    vol = stock_tool.compute_volatility("AMZN")
     assert isinstance(vol, float)
+    assert vol == pytest.approx(0.2223069, rel=1e-6)
+
+
+def test_get_summary(stock_tool):
+    assert stock_tool.get_summary("GOOG") == {
+        "ticker": "GOOG",
+        "current_price": 104.0,
+        "5_day_moving_avg": 102.0,
+        "1_month_return_pct": 4.0,
+        "volatility": 0.2223,
+    }
 
 
 # ----------------------------------------------------------------------
-# TEST: get_summary
+# TEST: batch_summary slices one multi-ticker download per ticker
 # ----------------------------------------------------------------------
-@patch("yfinance.Ticker")
-def test_get_summary(mock_ticker):
-    mock_obj = MagicMock()
-    mock_obj.history.return_value = mock_history_df()
-    mock_ticker.return_value = mock_obj
+def test_batch_summary(monkeypatch, history_df):
+    closes = {"AAPL": history_df["Close"], "MSFT": [200.0, 210.0, 220.0, None, None]}
+    data = pd.concat({t: pd.DataFrame({"Close": c}) for t, c in closes.items()}, axis=1)
+    monkeypatch.setattr("services.tools.stock_tool.yf.download", lambda *a, **k: data)
 
-    tool = StockTool()
-    summary = tool.get_summary("GOOG")
+    results = StockTool().batch_summary(["aapl", "msft", "tsla"])
 
-    assert summary["ticker"] == "GOOG"
-    assert "current_price" in summary
-    assert "5_day_moving_avg" in summary
-    assert "1_month_return_pct" in summary
-    assert "volatility" in summary
+    assert list(results) == ["AAPL", "MSFT", "TSLA"]
+    assert results["AAPL"]["current_price"] == 104.0
+    assert results["AAPL"]["1_month_return_pct"] == 4.0
+    # NaN rows padded onto MSFT's slice are dropped before the metrics
+    assert results["MSFT"]["current_price"] == 220.0
+    assert results["MSFT"]["5_day_moving_avg"] == 210.0
+    # missing from the download: an error entry instead of an exception
+    assert results["TSLA"]["ticker"] == "TSLA"
+    assert results["TSLA"]["error"].startswith("No summary available")
 
 
 # ----------------------------------------------------------------------
 # TEST: caching works
 # ----------------------------------------------------------------------
-@patch("yfinance.Ticker")
-def test_fetch_caching(mock_ticker):
-    mock_obj = MagicMock()
-    mock_obj.history.return_value = mock_history_df()
-    mock_ticker.return_value = mock_obj
-
-    tool = StockTool()
-    tool._fetch("NFLX", "1mo")
-    tool._fetch("NFLX", "1mo")  # second call should use cache
-
-    assert mock_obj.history.call_count == 1
+def test_fetch_caching(stock_tool):
+    first = stock_tool._fetch("NFLX", "1mo")
+    second = stock_tool._fetch("NFLX", "1mo")  # second call should use cache
+
+    # probe the cache itself rather than the mock's call bookkeeping
+    assert second is first
+    info = _fetch_history.cache_info()
+    assert (info.misses, info.hits, info.currsize) == (1, 1, 1)
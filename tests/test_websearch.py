@@ -1,80 +1,134 @@
 # tests/test_websearch.py
+from types import SimpleNamespace
+
 import pytest
 from services.tools import websearch_tool
 from services.agents.websearch_agent import WebSearchAgent
 
 
 # python -m pytest tests/test_websearch.py -vv
+def _returning(resp):
+    return lambda url, params, timeout: resp
+
+
+@pytest.fixture(autouse=True)
+def clear_news_cache():
+    # articles are cached per query, so mocked responses must not leak
+    websearch_tool._fetch_articles.cache_clear()
+    yield
+    websearch_tool._fetch_articles.cache_clear()
+
+
 # -----------------------------
 # Tests for the tool
 # -----------------------------
-def test_search_financial_news_success(monkeypatch):
-    # Mock requests.get to avoid real API calls
-    class MockResponse:
-        status_code = 200
-
-        def json(self):
-            return {
-                "articles": [
-                    {
-                        "title": "Stock rises",
-                        "description": "Stock XYZ rises 5%",
-                        "url": "https://example.com/1",
-                    },
-                    {
-                        "title": "Market update",
-                        "description": "",
-                        "url": "https://example.com/2",
-                    },
-                ]
-            }
+@pytest.mark.parametrize(
+    "resp_fixture,query,expected,exact",
+    [
+        (
+            "mock_response_success",
+            "stock XYZ",
+            ["- Stock XYZ rises 5%", "[Source 1](https://example.com/1)"],
+            False,
+        ),
+        (
+            "mock_response_empty",
+            "nonexistent query",
+            ["No recent news found for your query."],
+            True,
+        ),
+        (
+            "mock_response_fail",
+            "anything",
+            ["Could not fetch news at this time."],
+            True,
+        ),
+    ],
+    ids=["success", "no_articles", "api_fail"],
+)
+def test_search_financial_news(
+    monkeypatch, request, resp_fixture, query, expected, exact
+):
+    # Mock the pooled session (with a shared conftest response) to avoid real calls
+    resp = request.getfixturevalue(resp_fixture)
+    monkeypatch.setattr(websearch_tool._session, "get", _returning(resp))
+
+    result = websearch_tool.search_financial_news(query)
+    if exact:
+        assert [result] == expected
+    for text in expected:
+        assert text in result
 
-    monkeypatch.setattr(
-        websearch_tool.requests, "get", lambda url, params: MockResponse()
-    )
 
-    result = websearch_tool.search_financial_news("stock XYZ")
-    assert "- Stock XYZ rises 5%" in result
-    assert "[Source 1](https://example.com/1)" in result
+# -----------------------------
+# Tests for the per-query article cache
+# -----------------------------
+@pytest.fixture
+def news_calls(monkeypatch):
+    """Fake clock + session: set `clock[0]`, queue responses, count GETs."""
+    clock, responses, calls = [0.0], [], []
+    monkeypatch.setattr(websearch_tool, "time", SimpleNamespace(time=lambda: clock[0]))
 
+    def get(url, params, timeout):
+        calls.append(params["q"])
+        return responses.pop(0)
 
-def test_search_financial_news_no_articles(monkeypatch):
-    class MockResponse:
-        status_code = 200
+    monkeypatch.setattr(websearch_tool._session, "get", get)
+    return clock, responses, calls
 
-        def json(self):
-            return {"articles": []}
 
-    monkeypatch.setattr(
-        websearch_tool.requests, "get", lambda url, params: MockResponse()
-    )
+def test_same_bucket_is_served_from_cache(news_calls, mock_response_success):
+    clock, responses, calls = news_calls
+    responses.append(mock_response_success)
 
-    result = websearch_tool.search_financial_news("nonexistent query")
-    assert result == "No recent news found for your query."
+    first = websearch_tool.search_financial_news("stock XYZ")
+    clock[0] = websearch_tool.CACHE_TTL - 1  # still the same bucket
+    assert websearch_tool.search_financial_news("stock XYZ") == first
+    assert calls == ["stock XYZ"]
 
 
-def test_search_financial_news_api_fail(monkeypatch):
-    class MockResponse:
-        status_code = 500
+def test_new_bucket_refetches(news_calls, mock_response_success, mock_response_empty):
+    clock, responses, calls = news_calls
+    responses.extend([mock_response_success, mock_response_empty])
 
-    monkeypatch.setattr(
-        websearch_tool.requests, "get", lambda url, params: MockResponse()
+    assert "Stock XYZ rises 5%" in websearch_tool.search_financial_news("stock XYZ")
+    clock[0] = websearch_tool.CACHE_TTL  # next bucket
+    assert (
+        websearch_tool.search_financial_news("stock XYZ")
+        == "No recent news found for your query."
     )
+    assert calls == ["stock XYZ", "stock XYZ"]
+
 
-    result = websearch_tool.search_financial_news("anything")
-    assert result == "Could not fetch news at this time."
+def test_failed_fetch_is_not_cached(
+    news_calls, mock_response_fail, mock_response_success
+):
+    _, responses, calls = news_calls
+    responses.extend([mock_response_fail, mock_response_success])
+
+    assert (
+        websearch_tool.search_financial_news("stock XYZ")
+        == "Could not fetch news at this time."
+    )
+    # same bucket, but the failure was not cached: the next call retries
+    assert "Stock XYZ rises 5%" in websearch_tool.search_financial_news("stock XYZ")
+    assert calls == ["stock XYZ", "stock XYZ"]
 
 
 # -----------------------------
 # Tests for the agent
 # -----------------------------
-def test_websearch_agent(monkeypatch):
+@pytest.fixture(scope="session")
+def websearch_agent():
+    return WebSearchAgent()
+
+
+def test_websearch_agent(monkeypatch, websearch_agent):
     # Mock the underlying tool
     monkeypatch.setattr(
         "services.agents.websearch_agent.search_financial_news",
         lambda query: "- Mock news\n\n[Source 1](https://mock.com)",
     )
-    agent = WebSearchAgent()
-    result = agent.run("Tesla news")
+    result = websearch_agent.run("Tesla news")
     assert "- Mock news" in result
     assert "[Source 1](https://mock.com)" in result